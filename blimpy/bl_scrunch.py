@@ -9,8 +9,10 @@
 
 try:
     from .waterfall import Waterfall
+    from .utils import replace_suffix
 except:
     from waterfall import Waterfall
+    from utils import replace_suffix
 
 from optparse import OptionParser
 import sys
@@ -44,7 +46,7 @@ def bl_scrunch(filename, out_dir='./', new_filename=None, max_load=None, f_scrun
 
     fil_file = Waterfall(filename, max_load=max_load)
     if not new_filename:
-        new_filename = out_dir+filename.replace('.h5', '.scrunched.h5').split('/')[-1]
+        new_filename = out_dir + replace_suffix(os.path.basename(filename), '.h5', '.scrunched.h5')
 
     print("Using fscrunch %i" % f_scrunch)
     fil_file.write_to_hdf5(new_filename, f_scrunch=f_scrunch)
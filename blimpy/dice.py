@@ -9,6 +9,7 @@
 
 
 from .waterfall import Waterfall
+from .utils import replace_suffix
 import argparse
 import math
 import sys
@@ -70,21 +71,17 @@ def cmd_tool(args=None):
     if args.out_fname is None:
         if (args.out_format is None) or (args.out_format == 'h5'):
             if args.in_fname[len(args.in_fname)-4:] == '.fil':
-                args.out_fname = args.in_fname
-                args.out_fname = args.out_fname.replace('.fil','_diced.h5')
+                args.out_fname = replace_suffix(args.in_fname, '.fil', '_diced.h5')
             elif args.in_fname[len(args.in_fname)-3:] == '.h5':
-                args.out_fname = args.in_fname
-                args.out_fname = args.out_fname.replace('.h5','_diced.h5')
+                args.out_fname = replace_suffix(args.in_fname, '.h5', '_diced.h5')
             else:
                 logger.error('Input file not recognized')
                 sys.exit()
         elif args.out_format == 'fil':
             if args.in_fname[len(args.in_fname)-4:] == '.fil':
-                args.out_fname = args.in_fname
-                args.out_fname = args.out_fname.replace('.fil','_diced.fil')
+                args.out_fname = replace_suffix(args.in_fname, '.fil', '_diced.fil')
             elif args.in_fname[len(args.in_fname)-3:] == '.h5':
-                args.out_fname = args.in_fname
-                args.out_fname = args.out_fname.replace('.h5','_diced.fil')
+                args.out_fname = replace_suffix(args.in_fname, '.h5', '_diced.fil')
             else:
                 logger.error('input file not recognized.')
                 sys.exit()
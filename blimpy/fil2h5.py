@@ -9,8 +9,10 @@
 
 try:
     from .waterfall import Waterfall
+    from .utils import replace_suffix
 except:
     from waterfall import Waterfall
+    from utils import replace_suffix
 
 from optparse import OptionParser
 import sys
@@ -46,9 +48,9 @@ def make_h5_file(filename,out_dir='./', new_filename=None, max_load=None):
 
     fil_file = Waterfall(filename, max_load = max_load)
     if not new_filename:
-        new_filename = out_dir+filename.replace('.fil', '.h5').split('/')[-1]
+        new_filename = out_dir + replace_suffix(os.path.basename(filename), '.fil', '.h5')
 
-    if '.h5' not in new_filename:
+    if not new_filename.endswith('.h5'):
         new_filename = new_filename+'.h5'
 
     fil_file.write_to_hdf5(new_filename)
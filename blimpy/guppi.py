@@ -18,22 +18,15 @@ from astropy.coordinates import Angle
 from .utils import unpack, rebin
 import sys
 
-PYTHON3 = sys.version_info >= (3, 0)
-
-# Check if $DISPLAY is set (for handling plotting on remote machines with no X-forwarding)
-if 'DISPLAY' in os.environ.keys():
-
-    try:
-        import matplotlib
-        # matplotlib.use('Qt5Agg')
-    except ImportError:
-        pass
-    import pylab as plt
-else:
-    import matplotlib
+try:
+    # pocketfft: keeps complex64 in single precision, and can use several threads
+    from scipy.fft import fft as _fft
+    FFT_KWARGS = {'workers': -1}
+except ImportError:
+    from numpy.fft import fft as _fft
+    FFT_KWARGS = {}
 
-    matplotlib.use('Agg')
-    import pylab as plt
+PYTHON3 = sys.version_info >= (3, 0)
 
 ###
 # Config values
@@ -382,6 +375,8 @@ class GuppiRaw(object):
         header, data = self.read_next_data_block()
         data = data.view('float32')
 
+        from .plotting.config import plt
+
         plt.figure("Histogram")
         plt.hist(data.flatten(), 65, facecolor='#cc0000')
         if filename:
@@ -389,7 +384,7 @@ class GuppiRaw(object):
         plt.show()
 
     def plot_spectrum(self, filename=None, plot_db=True):
-        """ Do a (slow) numpy FFT and take power of data
+        """ Do an FFT and take power of data
 
         Args:
             filename (str): Name out output filename. If not set, file will not be saved to disk.
@@ -397,10 +392,12 @@ class GuppiRaw(object):
 
         TODO: Move into plotting/
         """
+        from .plotting.config import plt
+
         header, data = self.read_next_data_block()
 
         print("Computing FFT...")
-        d_xx_fft = np.abs(np.fft.fft(data[..., 0]))
+        d_xx_fft = np.abs(_fft(data[..., 0], **FFT_KWARGS))
         d_xx_fft = d_xx_fft.flatten()
 
         # Rebin to max number of points
@@ -9,8 +9,10 @@
 
 try:
     from .waterfall import Waterfall
+    from .utils import replace_suffix
 except:
     from waterfall import Waterfall
+    from utils import replace_suffix
 
 from optparse import OptionParser
 import sys
@@ -40,9 +42,9 @@ def make_fil_file(filename,out_dir='./', new_filename=None, max_load = None):
 
     fil_file = Waterfall(filename, max_load = max_load)
     if not new_filename:
-        new_filename = out_dir+filename.replace('.h5','.fil').split('/')[-1]
+        new_filename = out_dir + replace_suffix(os.path.basename(filename), '.h5', '.fil')
 
-    if '.fil' not in new_filename:
+    if not new_filename.endswith('.fil'):
         new_filename = new_filename+'.fil'
 
     fil_file.write_to_fil(new_filename)
@@ -160,8 +160,8 @@ class Reader(object):
             i_stop  = np.round((self.f_stop - f0)  / self.header['foff'])
 
         #calculate closest true index value
-        chan_start_idx = np.int(i_start)
-        chan_stop_idx  = np.int(i_stop)
+        chan_start_idx = int(i_start)
+        chan_stop_idx  = int(i_stop)
 
         if chan_stop_idx < chan_start_idx:
             chan_stop_idx, chan_start_idx = chan_start_idx,chan_stop_idx
@@ -215,9 +215,10 @@ class Reader(object):
 
         self._setup_chans()
 
-        #create freq array
-        i_vals = np.arange(self.chan_start_idx, self.chan_stop_idx)
-        freqs = self.header['foff'] * i_vals + f0
+        #create freq array, scaling and offsetting in place to avoid temporaries
+        freqs = np.arange(self.chan_start_idx, self.chan_stop_idx, dtype='float64')
+        freqs *= self.header['foff']
+        freqs += f0
 
         return freqs
 
@@ -270,6 +271,18 @@ class Reader(object):
 
         return n_blobs
 
+    def is_data_loaded(self):
+        """ Check if the data of the current selection has been read into self.data.
+        """
+
+        return np.shape(self.data) == tuple(self.selection_shape)
+
+    def close(self):
+        """ Release the data read so far, and any open file handle.
+        """
+
+        self.data = None
+
     def isheavy(self):
         """ Check if the current selection is too large.
         """
@@ -220,20 +220,41 @@ class FilReader(Reader):
                 blob = dd.reshape((int(dd.shape[0]/blob_dim[self.freq_axis]),blob_dim[self.beam_axis],blob_dim[self.freq_axis]))
         else:
 
-            for blobt in range(updated_blob_dim[self.time_axis]):
+            # Map the file once and copy each integration's channel range out of it,
+            # rather than opening and seeking the file again for every integration.
+            # The shape leaves out a trailing partial sample (e.g. a file still being written)
+            data_map = np.memmap(self.filename, dtype=self._d_type, mode='r', offset=int(self.idx_data),
+                                 shape=(int(np.prod(self.file_shape)),))
+            row_start = int(blob_start + n_blob*blob_dim[self.time_axis]*self.n_channels_in_file)
+            n_chans_blob = int(blob_dim[self.freq_axis])
 
-                #Load binary data
-                with open(self.filename, 'rb') as f:
-                    f.seek(int(self.idx_data + self._n_bytes * (blob_start + n_blob*blob_dim[self.time_axis]*self.n_channels_in_file + blobt*self.n_channels_in_file)))
-                    dd = np.fromfile(f, count=blob_dim[self.freq_axis], dtype=self._d_type)
+            for blobt in range(updated_blob_dim[self.time_axis]):
+                i0 = row_start + blobt*self.n_channels_in_file
+                blob[blobt] = data_map[i0:i0 + n_chans_blob]
 
-                blob[blobt] = dd
+            del data_map
 
 #         if self.header['foff'] < 0:
 #             blob = blob[:,:,::-1]
 
         return blob
 
+    def read_chans(self, c_start, c_stop):
+        """ Read all the integrations of the selection, for a range of its channels.
+
+        Args:
+            c_start (int): first channel, relative to the selection
+            c_stop (int): stop channel (exclusive), relative to the selection
+        """
+
+        data_map = np.memmap(self.filename, dtype=self._d_type, mode='r', offset=int(self.idx_data),
+                             shape=tuple(int(i) for i in self.file_shape))
+        chans = data_map[self.t_start:self.t_stop, :,
+                         self.chan_start_idx + c_start:self.chan_start_idx + c_stop].copy()
+        del data_map
+
+        return chans
+
     def read_all(self,reverse=True):
         """ read all the data.
             If reverse=True the x axis is flipped.
@@ -1,7 +1,17 @@
 from .sigproc import *
+from .fil_reader import FilReader
 import time
 import numpy as np
 
+# Max size of the cast copy made for each block of data written (in bytes)
+MAX_WRITE_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Output dtype for each number of bytes per value
+FIL_DTYPES = {4: np.float32, 2: np.int16, 1: np.int8}
+
+# Size of the buffer used when copying the data of a .fil file as raw bytes
+COPY_BLOCK_BYTES = 4 * 1024 * 1024
+
 
 def write_to_fil(wf, filename_out, *args, **kwargs):
     """ Write data to .fil file.
@@ -17,7 +27,8 @@ def write_to_fil(wf, filename_out, *args, **kwargs):
     # Update header
     wf._update_header()
 
-    if wf.container.isheavy():
+    # Stream from the file when the selection is too big to load, or was not loaded
+    if wf.container.isheavy() or not wf.container.is_data_loaded():
         __write_to_fil_heavy(wf, filename_out)
     else:
         __write_to_fil_light(wf, filename_out)
@@ -43,21 +54,19 @@ def __write_to_fil_heavy(wf, filename_out, *args, **kwargs):
     with open(filename_out, "wb") as fileh:
         fileh.write(generate_sigproc_header(wf))  # generate_sigproc_header comes from sigproc.py
 
-    wf.logger.info('Using %i n_blobs to write the data.' % n_blobs)
-    for ii in range(0, n_blobs):
-        wf.logger.info('Reading %i of %i' % (ii + 1, n_blobs))
+        if __is_raw_copy(wf, n_bytes):
+            wf.logger.info('Copying the data of %s unchanged.' % wf.container.filename)
+            __copy_raw_data(wf.container, fileh)
+            return
 
-        bob = wf.container.read_blob(blob_dim, n_blob=ii)
+        wf.logger.info('Using %i n_blobs to write the data.' % n_blobs)
+        for ii in range(0, n_blobs):
+            wf.logger.info('Reading %i of %i' % (ii + 1, n_blobs))
 
-        # Write data of .fil file.
-        with open(filename_out, "a") as fileh:
-            j = bob
-            if n_bytes == 4:
-                np.float32(j.ravel()).tofile(fileh)
-            elif n_bytes == 2:
-                np.int16(j.ravel()).tofile(fileh)
-            elif n_bytes == 1:
-                np.int8(j.ravel()).tofile(fileh)
+            bob = wf.container.read_blob(blob_dim, n_blob=ii)
+
+            # Write data of .fil file.
+            __write_data(fileh, bob, n_bytes)
 
 
 def __write_to_fil_light(wf, filename_out, *args, **kwargs):
@@ -70,10 +79,63 @@ def __write_to_fil_light(wf, filename_out, *args, **kwargs):
     n_bytes = wf.header['nbits'] / 8
     with open(filename_out, "wb") as fileh:
         fileh.write(generate_sigproc_header(wf))  # generate_sigproc_header comes from sigproc.py
-        j = wf.data
-        if n_bytes == 4:
-            np.float32(j.ravel()).tofile(fileh)
-        elif n_bytes == 2:
-            np.int16(j.ravel()).tofile(fileh)
-        elif n_bytes == 1:
-            np.int8(j.ravel()).tofile(fileh)
+        __write_data(fileh, wf.data, n_bytes)
+
+
+def __is_raw_copy(wf, n_bytes):
+    """ Check whether the output data is byte for byte the data of the input .fil file.
+
+    That is the case when the whole input file is selected, the data was not loaded
+    (so it cannot have been modified) and the number of bits is unchanged.
+    """
+    container = wf.container
+    if not isinstance(container, FilReader) or container.is_data_loaded():
+        return False
+    return (tuple(container.selection_shape) == tuple(container.file_shape) and
+            container._n_bytes == n_bytes)
+
+
+def __copy_raw_data(container, fileh):
+    """ Copy the data section of a .fil file to an open .fil file, without decoding it.
+
+    Args:
+        container (FilReader): Reader of the input file
+        fileh (file): File handle, positioned after the header
+    """
+
+    n_left = int(np.prod(container.file_shape)) * container._n_bytes
+    with open(container.filename, 'rb') as f:
+        f.seek(int(container.idx_data))
+        while n_left > 0:
+            buf = f.read(min(COPY_BLOCK_BYTES, n_left))
+            if not buf:
+                break
+            fileh.write(buf)
+            n_left -= len(buf)
+
+
+def __write_data(fileh, data, n_bytes):
+    """ Write data to an open .fil file, a block of integrations at a time.
+
+    Casting the whole array in one go makes a copy as large as the data itself;
+    writing in blocks keeps that copy small, and the file is still written sequentially.
+    Data that is already contiguous and of the output type is written without a copy.
+
+    Args:
+        fileh (file): File handle, positioned after the header
+        data (np.array): Data to write, with time as the first axis
+        n_bytes (int): Number of bytes per value
+    """
+
+    dtype = FIL_DTYPES.get(n_bytes)
+    if dtype is None:
+        return
+
+    n_ints = data.shape[0]
+    int_bytes = max(1, data[:1].size) * 4  # At most 4 bytes per value once cast
+    ints_per_block = max(1, int(MAX_WRITE_BLOCK_BYTES // int_bytes))
+
+    for t_start in range(0, n_ints, ints_per_block):
+        # Only copies when the block is not already contiguous data of the right type
+        j = np.ascontiguousarray(data[t_start:t_start + ints_per_block], dtype=dtype)
+        j.tofile(fileh)
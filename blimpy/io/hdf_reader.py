@@ -96,6 +96,13 @@ class H5Reader(Reader):
         else:
             raise IOError("Need a file to open, please give me one!")
 
+    def close(self):
+        """ Release the data read so far, and close the .h5 file.
+        """
+
+        super(H5Reader, self).close()
+        self.h5.close()
+
     def read_header(self):
         """ Read header and return a Python dictionary of key:value pairs
         """
@@ -177,4 +184,15 @@ class H5Reader(Reader):
 #         if self.header['foff'] < 0:
 #             blob = blob[:,:,::-1]
 
-        return blob
\ No newline at end of file
+        return blob
+
+    def read_chans(self, c_start, c_stop):
+        """ Read all the integrations of the selection, for a range of its channels.
+
+        Args:
+            c_start (int): first channel, relative to the selection
+            c_stop (int): stop channel (exclusive), relative to the selection
+        """
+
+        return self.h5["data"][self.t_start:self.t_stop, :,
+                               self.chan_start_idx + c_start:self.chan_start_idx + c_stop]
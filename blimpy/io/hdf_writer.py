@@ -1,8 +1,27 @@
 import time
+import threading
+from contextlib import closing
+import zlib
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+import numpy as np
 import h5py
+from six.moves import queue
 import hdf5plugin
 from blimpy import utils
 
+# Compression filters available for the output datasets, see __get_compression
+COMPRESSION_TYPES = ('bitshuffle', 'blosc', 'lzf', 'gzip', 'none')
+
+# Smallest raw data chunk cache for the output files, in bytes (the HDF5 default is 1 MiB)
+MIN_CHUNK_CACHE_BYTES = 16 * 1024 * 1024
+
+# Chunk encoders for the filters we can apply ourselves, for direct chunk writes
+CHUNK_ENCODERS = {
+    'none': lambda chunk: np.ascontiguousarray(chunk).tobytes(),
+    'gzip': lambda chunk: zlib.compress(np.ascontiguousarray(chunk).tobytes(), 4),
+}
+
 
 def write_to_hdf5(wf, filename_out, f_scrunch=None, *args, **kwargs):
     """ Write data to HDF5 file.
@@ -11,6 +30,11 @@ def write_to_hdf5(wf, filename_out, f_scrunch=None, *args, **kwargs):
     Args:
         filename_out (str): Name of output file
         f_scrunch (int or None): Average (scrunch) N channels together
+        chunks (tuple or None): Chunk dimensions (time, feed, freq) of the output.
+                                Default: chosen from the header, see Waterfall._get_chunk_dimensions
+        compression (str): Compression filter, one of COMPRESSION_TYPES. Default: 'bitshuffle'
+        precision_reduce (bool): Reduce the precision of the data before compression (lossy!),
+                                 see utils.quantize. Default: False
     """
 
     #For timing how long it takes to write a file.
@@ -19,7 +43,8 @@ def write_to_hdf5(wf, filename_out, f_scrunch=None, *args, **kwargs):
     #Update header
     wf._update_header()
 
-    if wf.container.isheavy():
+    # Stream from the file when the selection is too big to load, or was not loaded
+    if wf.container.isheavy() or not wf.container.is_data_loaded():
         __write_to_hdf5_heavy(wf, filename_out, f_scrunch=f_scrunch, *args, **kwargs)
     else:
         __write_to_hdf5_light(wf, filename_out, f_scrunch=f_scrunch, *args, **kwargs)
@@ -28,56 +53,53 @@ def write_to_hdf5(wf, filename_out, f_scrunch=None, *args, **kwargs):
     wf.logger.info('Conversion time: %2.2fsec' % (t1- t0))
 
 
-def __write_to_hdf5_heavy(wf, filename_out, f_scrunch=None, *args, **kwargs):
+def __write_to_hdf5_heavy(wf, filename_out, f_scrunch=None, precision_reduce=False, chunks=None,
+                          compression='bitshuffle', *args, **kwargs):
     """ Write data to HDF5 file.
 
     Args:
         filename_out (str): Name of output file
         f_scrunch (int or None): Average (scrunch) N channels together
+        precision_reduce (bool): Reduce the precision of the data before compression
+        chunks (tuple or None): Chunk dimensions of the output
+        compression (str): Compression filter, one of COMPRESSION_TYPES
     """
 
     block_size = 0
 
     # Note that a chunk is not a blob!!
     # chunk_dim = wf._get_chunk_dimensions() <-- seems intended for raw to fil
-    # And, chunk dimensions should not exceed the Waterfall selection shape dimensions.
-    chunk_list = list(wf._get_chunk_dimensions())
-    for ix in range(0, len(chunk_list)):
-        if chunk_list[ix] > wf.selection_shape[ix]:
-            chunk_list[ix] = wf.selection_shape[ix]
-    chunk_dim = tuple(chunk_list)
+    chunk_dim = __get_chunk_dimensions(wf, wf.selection_shape, chunks)
     blob_dim  = wf._get_blob_dimensions(chunk_dim)
     n_blobs   = wf.container.calc_n_blobs(blob_dim)
 
-    with h5py.File(filename_out, 'w') as h5:
+    dout_shape     = list(wf.selection_shape)    # Make sure not a tuple
+    dout_chunk_dim = list(chunk_dim)
 
-        h5.attrs['CLASS'] = 'FILTERBANK'
-        h5.attrs['VERSION'] = '1.0'
+    if f_scrunch is not None:
+        dout_shape[-1] //= f_scrunch
+        dout_chunk_dim[-1] //= f_scrunch
 
-        bs_compression = hdf5plugin.Bitshuffle(nelems=0, lz4=True)['compression']
-        bs_compression_opts = hdf5plugin.Bitshuffle(nelems=0, lz4=True)['compression_opts']
+    cache_kwargs = __get_chunk_cache(dout_shape, dout_chunk_dim, wf.data.dtype)
 
-        dout_shape     = list(wf.selection_shape)    # Make sure not a tuple
-        dout_chunk_dim = list(chunk_dim)
+    with h5py.File(filename_out, 'w', **cache_kwargs) as h5:
 
-        if f_scrunch is not None:
-            dout_shape[-1] //= f_scrunch
-            dout_chunk_dim[-1] //= f_scrunch
-            wf.header['foff'] *= f_scrunch
+        h5.attrs['CLASS'] = 'FILTERBANK'
+        h5.attrs['VERSION'] = '1.0'
+
+        compression_kwargs = __get_compression(compression)
 
         dset = h5.create_dataset('data',
                                  shape=tuple(dout_shape),
                                  chunks=tuple(dout_chunk_dim),
-                                 compression=bs_compression,
-                                 compression_opts=bs_compression_opts,
-                                 dtype=wf.data.dtype)
+                                 dtype=wf.data.dtype,
+                                 **compression_kwargs)
 
         dset_mask = h5.create_dataset('mask',
                                       shape=tuple(dout_shape),
                                       chunks=tuple(dout_chunk_dim),
-                                      compression=bs_compression,
-                                      compression_opts=bs_compression_opts,
-                                      dtype='uint8')
+                                      dtype='uint8',
+                                      **compression_kwargs)
 
         dset.dims[2].label = b"frequency"
         dset.dims[1].label = b"feed_id"
@@ -87,97 +109,133 @@ def __write_to_hdf5_heavy(wf, filename_out, f_scrunch=None, *args, **kwargs):
         dset_mask.dims[1].label = b"feed_id"
         dset_mask.dims[0].label = b"time"
 
-        # Copy over header information as attributes
+        # Copy over header information as attributes. The header itself is left alone:
+        # the readers work out the selected channels from foff.
         for key, value in wf.header.items():
             dset.attrs[key] = value
+        if f_scrunch is not None:
+            dset.attrs['foff'] = wf.header['foff'] * f_scrunch
 
-        if blob_dim[wf.freq_axis] < wf.selection_shape[wf.freq_axis]:
+        if precision_reduce and np.issubdtype(wf.data.dtype, np.floating):
+            wf.logger.info('Estimating the noise of each channel, to reduce the precision of the data')
+            sigma = __get_quantize_sigma(wf, blob_dim, f_scrunch)
+        else:
+            sigma = None
 
-            wf.logger.info('Using %i n_blobs to write the data.'% n_blobs)
-            for ii in range(0, n_blobs):
-                wf.logger.info('Reading %i of %i' % (ii + 1, n_blobs))
+        if f_scrunch is None and not precision_reduce and __copy_raw_chunks(wf, dset):
+            wf.logger.info('Copied the compressed chunks without recompressing them.')
 
-                bob = wf.container.read_blob(blob_dim, n_blob=ii)
+        elif blob_dim[wf.freq_axis] < wf.selection_shape[wf.freq_axis]:
 
-                #-----
-                #Using channels instead of frequency.
-                c_start = wf.container.chan_start_idx + ii * blob_dim[wf.freq_axis]
-                t_start = wf.container.t_start + (c_start / wf.selection_shape[wf.freq_axis]) * blob_dim[wf.time_axis]
-                t_stop = t_start + blob_dim[wf.time_axis]
+            wf.logger.info('Using %i n_blobs to write the data.'% n_blobs)
+            with closing(__iter_blobs(wf, blob_dim, n_blobs)) as blobs:
+                for ii, bob in blobs:
+                    wf.logger.info('Reading %i of %i' % (ii + 1, n_blobs))
+
+                    #-----
+                    #Using channels instead of frequency, relative to the selection (and output).
+                    c_start = ii * blob_dim[wf.freq_axis]
+                    t_start = (c_start // wf.selection_shape[wf.freq_axis]) * blob_dim[wf.time_axis]
+                    t_stop = t_start + bob.shape[wf.time_axis]
 
-                # Reverse array if frequency axis is flipped
+                    # Reverse array if frequency axis is flipped
 #                     if self.header['foff'] < 0:
 #                         c_stop = self.selection_shape[self.freq_axis] - (c_start)%self.selection_shape[self.freq_axis]
 #                         c_start = c_stop - blob_dim[self.freq_axis]
 #                     else:
-                c_start = (c_start) % wf.selection_shape[wf.freq_axis]
-                c_stop = c_start + blob_dim[wf.freq_axis]
-                #-----
+                    c_start = (c_start) % wf.selection_shape[wf.freq_axis]
+                    c_stop = c_start + blob_dim[wf.freq_axis]
+                    #-----
+
+                    if f_scrunch is not None:
+                        c_start //= f_scrunch
+                        c_stop  //= f_scrunch
+                        bob = utils.rebin(bob, n_z=f_scrunch)
 
-                if f_scrunch is not None:
-                    c_start //= f_scrunch
-                    c_stop  //= f_scrunch
-                    bob = utils.rebin(bob, n_z=f_scrunch)
+                    if precision_reduce:
+                        bob = utils.quantize(bob, sigma=None if sigma is None else sigma[..., c_start:c_stop])
 
-                wf.logger.debug(t_start,t_stop,c_start,c_stop)
-                dset[t_start:t_stop,0,c_start:c_stop] = bob[:]
+                    wf.logger.debug(t_start,t_stop,c_start,c_stop)
+                    dset[t_start:t_stop,0,c_start:c_stop] = bob[:]
 
         else:
 
+            # zlib releases the GIL, so chunks are encoded in parallel
+            pool = ThreadPool(cpu_count()) if compression in CHUNK_ENCODERS else None
+
             wf.logger.info('Using %i n_blobs to write the data.'% n_blobs)
-            for ii in range(0, n_blobs):
-                wf.logger.info('Reading %i of %i' % (ii + 1, n_blobs))
+            with closing(__iter_blobs(wf, blob_dim, n_blobs)) as blobs:
+                for ii, bob in blobs:
+                    wf.logger.info('Reading %i of %i' % (ii + 1, n_blobs))
+                    # Output time range, relative to the selection. The last blob may be shorter.
+                    t_start = ii * blob_dim[wf.time_axis]
+                    t_stop = t_start + bob.shape[wf.time_axis]
 
-                bob = wf.container.read_blob(blob_dim, n_blob=ii)
-                t_start = wf.container.t_start + ii * blob_dim[wf.time_axis]
+                    if f_scrunch is not None:
+                        bob = utils.rebin(bob, n_z=f_scrunch)
 
-                #This prevents issues when the last blob is smaller than the others in time
-                if (ii+1)*blob_dim[wf.time_axis] > wf.n_ints_in_file:
-                    t_stop = wf.n_ints_in_file
-                else:
-                    t_stop = (ii+1)*blob_dim[wf.time_axis]
+                    if precision_reduce:
+                        bob = utils.quantize(bob, sigma=sigma)
 
-                if f_scrunch is not None:
-                    bob = utils.rebin(bob, n_z=f_scrunch)
+                    if pool is None or not __write_direct_chunks(dset, t_start, bob, compression, pool):
+                        dset[t_start:t_stop] = bob[:]
 
-                dset[t_start:t_stop] = bob[:]
+            if pool is not None:
+                pool.close()
+                pool.join()
 
 
-def __write_to_hdf5_light(wf, filename_out, f_scrunch=None, *args, **kwargs):
+def __write_to_hdf5_light(wf, filename_out, f_scrunch=None, precision_reduce=False, chunks=None,
+                          compression='bitshuffle', *args, **kwargs):
     """ Write data to HDF5 file in one go.
 
     Args:
         filename_out (str): Name of output file
         f_scrunch (int or None): Average (scrunch) N channels together
+        precision_reduce (bool): Reduce the precision of the data before compression
+        chunks (tuple or None): Chunk dimensions of the output
+        compression (str): Compression filter, one of COMPRESSION_TYPES
     """
 
     block_size = 0
 
-    with h5py.File(filename_out, 'w') as h5:
+    # Compression works chunk by chunk, so use the same chunking as the heavy path
+    # rather than letting h5py guess one. As there, the data product is identified
+    # from the header before scrunching, and the chunks are then scrunched too.
+    chunk_dim = list(__get_chunk_dimensions(wf, wf.data.shape, chunks))
+
+    if f_scrunch is None:
+        data_out = wf.data
+    else:
+        wf.logger.info('Frequency scrunching by %i' % f_scrunch)
+        data_out = utils.rebin(wf.data, n_z=f_scrunch)
+        chunk_dim[-1] = max(1, min(chunk_dim[-1] // f_scrunch, data_out.shape[-1]))
+
+    chunk_dim = tuple(chunk_dim)
+
+    if precision_reduce:
+        wf.logger.info('Reducing precision of data before compression')
+        data_out = utils.quantize(data_out)
+
+    cache_kwargs = __get_chunk_cache(data_out.shape, chunk_dim, data_out.dtype)
+
+    with h5py.File(filename_out, 'w', **cache_kwargs) as h5:
 
         h5.attrs['CLASS']   = 'FILTERBANK'
         h5.attrs['VERSION'] = '1.0'
 
-        bs_compression = hdf5plugin.Bitshuffle(nelems=0, lz4=True)['compression']
-        bs_compression_opts = hdf5plugin.Bitshuffle(nelems=0, lz4=True)['compression_opts']
-
-        if f_scrunch is None:
-            data_out = wf.data
-        else:
-            wf.logger.info('Frequency scrunching by %i' % f_scrunch)
-            data_out = utils.rebin(wf.data, n_z=f_scrunch)
-            wf.header['foff'] *= f_scrunch
+        compression_kwargs = __get_compression(compression)
 
         dset = h5.create_dataset('data',
                                  data=data_out,
-                                 compression=bs_compression,
-                                 compression_opts=bs_compression_opts)
+                                 chunks=chunk_dim,
+                                 **compression_kwargs)
 
         dset_mask = h5.create_dataset('mask',
                                       shape=data_out.shape,
-                                      compression=bs_compression,
-                                      compression_opts=bs_compression_opts,
-                                      dtype='uint8')
+                                      chunks=chunk_dim,
+                                      dtype='uint8',
+                                      **compression_kwargs)
 
         dset.dims[2].label = b"frequency"
         dset.dims[1].label = b"feed_id"
@@ -187,7 +245,252 @@ def __write_to_hdf5_light(wf, filename_out, f_scrunch=None, *args, **kwargs):
         dset_mask.dims[1].label = b"feed_id"
         dset_mask.dims[0].label = b"time"
 
-        # Copy over header information as attributes
+        # Copy over header information as attributes. The header itself is left alone:
+        # the readers work out the selected channels from foff.
         for key, value in wf.header.items():
             dset.attrs[key] = value
+        if f_scrunch is not None:
+            dset.attrs['foff'] = wf.header['foff'] * f_scrunch
+
+
+def __get_quantize_sigma(wf, blob_dim, f_scrunch=None):
+    """ Get the noise of each output channel for utils.quantize, from the whole selection.
+
+    The heavy writer quantizes one blob at a time, but a blob may hold only a few
+    integrations; the noise is estimated from all of them, as in the light writer.
+    The selection is read in blocks of channels about the size of a blob.
+
+    Args:
+        blob_dim (tuple): Shape of blob
+        f_scrunch (int or None): Average (scrunch) N channels together
+    """
+
+    f_scrunch = f_scrunch or 1
+    n_ints, n_ifs, n_chans = [int(i) for i in wf.selection_shape]
+    n_chans = n_chans // f_scrunch * f_scrunch  # As utils.rebin, drop the last partial group
+
+    chans_per_block = max(1, int(np.prod(blob_dim)) // (n_ints * n_ifs))
+    chans_per_block = max(f_scrunch, chans_per_block // f_scrunch * f_scrunch)
+
+    sigma = []
+    for c_start in range(0, n_chans, chans_per_block):
+        chans = wf.container.read_chans(c_start, min(c_start + chans_per_block, n_chans))
+        if f_scrunch > 1:
+            chans = utils.rebin(chans, n_z=f_scrunch)
+        sigma.append(utils.quantize_sigma(chans))
+
+    return np.concatenate(sigma, axis=-1)
+
+
+def __iter_blobs(wf, blob_dim, n_blobs):
+    """ Iterate over the blobs of the selection, in order.
+
+    The next blob is read in a background thread while the current one is being
+    compressed and written, so that reading and writing overlap. At most two blobs
+    are held at a time: the one being written, and the next one. This is the same
+    as the plain read-then-write loop, where the next blob is read before the
+    previous one is released.
+
+    Close the iterator (e.g. with contextlib.closing) when not consuming it to the
+    end, so that the reader thread stops.
+
+    Args:
+        blob_dim (tuple): Shape of blob
+        n_blobs (int): Number of blobs to read
+
+    Yields (blob number, blob) tuples.
+    """
+
+    # A blob is only read once one of the two slots is free
+    slots = queue.Queue()
+    for _ in range(2):
+        slots.put(None)
+    blobs = queue.Queue()
+    stop = threading.Event()
+
+    def read_blobs():
+        try:
+            for ii in range(0, n_blobs):
+                while True:
+                    if stop.is_set():
+                        return
+                    try:
+                        slots.get(timeout=0.1)
+                        break
+                    except queue.Empty:
+                        pass
+                blobs.put((ii, wf.container.read_blob(blob_dim, n_blob=ii), None))
+        except Exception as e:
+            blobs.put((None, None, e))
+
+    reader = threading.Thread(target=read_blobs, name='blimpy-read-blobs')
+    reader.daemon = True
+    reader.start()
+
+    try:
+        for _ in range(0, n_blobs):
+            ii, bob, error = blobs.get()
+            if error is not None:
+                raise error
+            yield ii, bob
+            del bob
+            slots.put(None)
+    finally:
+        # Also reached when the writer fails, or stops early
+        stop.set()
+
+    reader.join()
+
+
+def __copy_raw_chunks(wf, dset):
+    """ Copy the still-compressed chunks of an HDF5 source straight into dset.
+
+    This is only possible when the whole file is selected and the source uses
+    the same shape, chunking and filters as dset. The chunks then skip the
+    decompress / recompress round trip through the filter pipeline.
+
+    Args:
+        dset (h5py.Dataset): Output dataset, already created
+
+    Returns True if the data was copied, False if the caller must write it.
+    """
+
+    h5 = getattr(wf.container, 'h5', None)
+    if h5 is None or 'data' not in h5:
+        return False
+
+    src = h5['data']
+    if src.shape != dset.shape or src.chunks != dset.chunks or src.dtype != dset.dtype:
+        return False
+
+    if tuple(wf.selection_shape) != tuple(wf.file_shape):
+        return False
+
+    # Both chunk iteration and direct chunk I/O need HDF5 >= 1.10.5
+    if not hasattr(src.id, 'get_num_chunks') or not hasattr(src.id, 'read_direct_chunk'):
+        return False
+
+    def filters(ds):
+        plist = ds.id.get_create_plist()
+        return [plist.get_filter(ii)[:3] for ii in range(plist.get_nfilters())]
+
+    if filters(src) != filters(dset):
+        return False
+
+    n_chunks = src.id.get_num_chunks()
+    wf.logger.info('Copying %i compressed chunks.' % n_chunks)
+    for ii in range(n_chunks):
+        offset = src.id.get_chunk_info(ii).chunk_offset
+        filter_mask, chunk = src.id.read_direct_chunk(offset)
+        dset.id.write_direct_chunk(offset, chunk, filter_mask)
+
+    return True
+
+
+def __write_direct_chunks(dset, t_start, bob, compression, pool):
+    """ Write a blob spanning the full width of dset with HDF5 direct chunk writes.
+
+    Whole chunks are encoded here (in the threads of pool) and written as they are,
+    bypassing the HDF5 filter pipeline; partial chunks at the edges go through it.
+
+    Args:
+        dset (h5py.Dataset): Output dataset
+        t_start (int): Time index of the first integration of the blob in dset
+        bob (np.array): Blob of data
+        compression (str): Compression of dset, one of CHUNK_ENCODERS
+        pool (ThreadPool): Pool for encoding the chunks
+
+    Returns True if the blob was written, False if the caller must write it.
+    """
+
+    if not hasattr(dset.id, 'write_direct_chunk') or bob.dtype != dset.dtype:
+        return False
+
+    c_time, c_feed, c_freq = dset.chunks
+    if bob.shape[1:] != dset.shape[1:] or t_start % c_time or dset.shape[1] % c_feed:
+        return False
+
+    n_time = bob.shape[0] - bob.shape[0] % c_time
+    n_freq = bob.shape[2] - bob.shape[2] % c_freq
+
+    offsets = [(t, f, c) for t in range(0, n_time, c_time)
+                         for f in range(0, bob.shape[1], c_feed)
+                         for c in range(0, n_freq, c_freq)]
+
+    def encode(offset):
+        t, f, c = offset
+        return CHUNK_ENCODERS[compression](bob[t:t + c_time, f:f + c_feed, c:c + c_freq])
+
+    for (t, f, c), chunk in zip(offsets, pool.imap(encode, offsets)):
+        dset.id.write_direct_chunk((t_start + t, f, c), chunk)
+
+    # Partial chunks at the far ends of the time and frequency axes
+    if n_freq < bob.shape[2]:
+        dset[t_start:t_start + n_time, :, n_freq:] = bob[:n_time, :, n_freq:]
+    if n_time < bob.shape[0]:
+        dset[t_start + n_time:t_start + bob.shape[0]] = bob[n_time:]
+
+    return True
+
+
+def __get_chunk_cache(shape, chunk_dim, dtype):
+    """ Get the raw data chunk cache settings (h5py.File keyword arguments) for an output file.
+
+    The cache holds at least one row of chunks across the frequency axis, so that writes
+    thinner than a chunk in time do not flush and re-read (decompress) partial chunks,
+    and never less than MIN_CHUNK_CACHE_BYTES or four chunks.
+
+    Args:
+        shape (tuple): Shape of the output dataset
+        chunk_dim (tuple): Chunk dimensions of the output dataset
+        dtype (np.dtype): Data type of the output dataset
+    """
+
+    chunk_bytes = int(np.prod(chunk_dim)) * np.dtype(dtype).itemsize
+    n_chunks_row = -(-shape[-1] // chunk_dim[-1])
+    rdcc_nbytes = max(MIN_CHUNK_CACHE_BYTES, 4 * chunk_bytes, chunk_bytes * n_chunks_row)
+
+    # HDF5 suggests about 100 hash slots per chunk that fits in the cache
+    n_chunks_cache = rdcc_nbytes // max(1, chunk_bytes)
+    rdcc_nslots = int(min(max(521, 100 * n_chunks_cache), 1000003))
+
+    # Chunks are written once and never read back, so evict fully written chunks first
+    return {'rdcc_nbytes': int(rdcc_nbytes), 'rdcc_nslots': rdcc_nslots, 'rdcc_w0': 1.0}
+
+
+def __get_compression(compression):
+    """ Get the create_dataset() keyword arguments for a compression filter.
+
+    Args:
+        compression (str): One of COMPRESSION_TYPES
+
+    Returns dictionary of compression keyword arguments.
+    """
+
+    if compression == 'bitshuffle':
+        return dict(hdf5plugin.Bitshuffle(nelems=0, lz4=True))
+    elif compression == 'blosc':
+        return dict(hdf5plugin.Blosc(cname='lz4', clevel=5, shuffle=hdf5plugin.Blosc.SHUFFLE))
+    elif compression == 'lzf':
+        return {'compression': 'lzf'}
+    elif compression == 'gzip':
+        return {'compression': 'gzip', 'compression_opts': 4}
+    elif compression == 'none' or compression is None:
+        return {}
+    else:
+        raise ValueError('Unknown compression %r, please use one of %s' % (compression, ', '.join(COMPRESSION_TYPES)))
+
+
+def __get_chunk_dimensions(wf, data_shape, chunks=None):
+    """ Get the chunk dimensions for a dataset of the given shape.
+
+    Args:
+        data_shape (tuple): Shape of the dataset to be written
+        chunks (tuple or None): Requested chunk dimensions. Default: from wf._get_chunk_dimensions()
+
+    Returns chunk dimensions, which do not exceed the dataset dimensions.
+    """
+
+    chunk_dim = wf._get_chunk_dimensions() if chunks is None else chunks
 
+    return tuple(min(int(c), int(s)) for c, s in zip(chunk_dim, data_shape))
@@ -4,7 +4,7 @@ import numpy as np
 # Check if $DISPLAY is set (for handling plotting on remote machines with no X-forwarding)
 import matplotlib
 
-if 'DISPLAY' in os.environ.keys():
+if 'DISPLAY' in os.environ:
     import pylab as plt
 else:
     matplotlib.use('Agg')
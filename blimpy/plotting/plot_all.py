@@ -1,5 +1,6 @@
 from .config import *
 from . import plot_time_series, plot_kurtosis, plot_spectrum_min_max, plot_waterfall, plot_spectrum
+from .plot_utils import grab_plot_data, calc_plot_stats
 from astropy import units as u
 
 
@@ -53,9 +54,21 @@ def plot_all(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, kurtosis
     #         plt.colorbar(heatmap, cax = axColorbar)
     # --------
     
+    # Grab the data once, and share it between all the subplots.
+    grabbed_data = grab_plot_data(wf, f_start, f_stop, if_id=if_id)
+
+    # Likewise the per-channel and per-integration statistics, calculated in one pass.
+    # The subplots show ascending frequency, so calculate them in that order.
+    stats = None
+    plot_data = grabbed_data[1]
+    if plot_data.ndim == 2:
+        if wf.header['foff'] < 0:
+            plot_data = plot_data[..., ::-1]
+        stats = calc_plot_stats(plot_data, kurtosis=kurtosis)
+
     axMinMax = plt.axes(rect_min_max)
     print('Plotting Min Max')
-    plot_spectrum_min_max(wf, logged=logged, f_start=f_start, f_stop=f_stop, t=t)
+    plot_spectrum_min_max(wf, logged=logged, f_start=f_start, f_stop=f_stop, t=t, if_id=if_id, _data=grabbed_data, _stats=stats)
     plt.title('')
     axMinMax.yaxis.tick_right()
     axMinMax.yaxis.set_label_position("right")
@@ -63,7 +76,7 @@ def plot_all(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, kurtosis
     # --------
     axSpectrum = plt.axes(rect_spectrum,sharex=axMinMax)
     print('Plotting Spectrum')
-    plot_spectrum(wf, logged=logged, f_start=f_start, f_stop=f_stop, t=t)
+    plot_spectrum(wf, logged=logged, f_start=f_start, f_stop=f_stop, t=t, if_id=if_id, _data=grabbed_data, _stats=stats)
     plt.title('')
     axSpectrum.yaxis.tick_right()
     axSpectrum.yaxis.set_label_position("right")
@@ -74,7 +87,7 @@ def plot_all(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, kurtosis
     # --------
     axWaterfall = plt.axes(rect_waterfall,sharex=axMinMax)
     print('Plotting Waterfall')
-    plot_waterfall(wf, f_start=f_start, f_stop=f_stop, logged=logged, cb=False)
+    plot_waterfall(wf, f_start=f_start, f_stop=f_stop, if_id=if_id, logged=logged, cb=False, _data=grabbed_data)
     plt.xlabel('')
 
     # no labels
@@ -84,7 +97,7 @@ def plot_all(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, kurtosis
     # --------
     axTimeseries = plt.axes(rect_timeseries)
     print('Plotting Timeseries')
-    plot_time_series(wf, f_start=f_start, f_stop=f_stop, orientation='v')
+    plot_time_series(wf, f_start=f_start, f_stop=f_stop, if_id=if_id, orientation='v', _data=grabbed_data, _stats=stats)
     axTimeseries.yaxis.set_major_formatter(nullfmt)
 #        axTimeseries.xaxis.set_major_formatter(nullfmt)
 
@@ -93,7 +106,7 @@ def plot_all(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, kurtosis
     if kurtosis:
         axKurtosis = plt.axes(rect_kurtosis)
         print('Plotting Kurtosis')
-        plot_kurtosis(wf, f_start=f_start, f_stop=f_stop)
+        plot_kurtosis(wf, f_start=f_start, f_stop=f_stop, if_id=if_id, _data=grabbed_data, _stats=stats)
 
 
     # --------
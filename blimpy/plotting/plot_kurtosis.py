@@ -1,18 +1,20 @@
 from .config import *
-import scipy.stats
+from .plot_utils import calc_kurtosis
 
 
-def plot_kurtosis(wf, f_start=None, f_stop=None, if_id=0, **kwargs):
+def plot_kurtosis(wf, f_start=None, f_stop=None, if_id=0, _data=None, _stats=None, **kwargs):
     """ Plot kurtosis
 
      Args:
         f_start (float): start frequency, in MHz
         f_stop (float): stop frequency, in MHz
+        _data (tuple): (plot_f, plot_data) from wf.grab_data(), if already grabbed
+        _stats (dict): statistics from plot_utils.calc_plot_stats(), if already calculated
         kwargs: keyword args to be passed to matplotlib imshow()
     """
     ax = plt.gca()
 
-    plot_f, plot_data = wf.grab_data(f_start, f_stop, if_id)
+    plot_f, plot_data = _data if _data is not None else wf.grab_data(f_start, f_stop, if_id=if_id)
 
     # Using accending frequency for all plots.
     if wf.header['foff'] < 0:
@@ -20,7 +22,7 @@ def plot_kurtosis(wf, f_start=None, f_stop=None, if_id=0, **kwargs):
         plot_f = plot_f[::-1]
 
     try:
-        pltdata = scipy.stats.kurtosis(plot_data, axis=0, nan_policy='omit')
+        pltdata = _stats['kurtosis'] if _stats is not None else calc_kurtosis(plot_data)
     except:
         pltdata = plot_data * 0.0
 
@@ -1,8 +1,9 @@
 from .config import *
 from ..utils import rebin, db
+from .plot_utils import grab_plot_data
 
 
-def plot_spectrum(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, c=None, **kwargs):
+def plot_spectrum(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, c=None, _data=None, _stats=None, **kwargs):
     """ Plot frequency spectrum of a given file
 
     Args:
@@ -10,6 +11,8 @@ def plot_spectrum(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, c=N
         logged (bool): Plot in linear (False) or dB units (True)
         if_id (int): IF identification (if multiple IF signals in file)
         c: color for line
+        _data (tuple): (plot_f, plot_data) from plot_utils.grab_plot_data(), if already grabbed
+        _stats (dict): statistics from plot_utils.calc_plot_stats(), if already calculated
         kwargs: keyword args to be passed to matplotlib plot()
     """
     if wf.header['nbits'] <= 2:
@@ -17,7 +20,7 @@ def plot_spectrum(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, c=N
         t = 'all'
     ax = plt.gca()
 
-    plot_f, plot_data = wf.grab_data(f_start, f_stop, if_id)
+    plot_f, plot_data = _data if _data is not None else grab_plot_data(wf, f_start, f_stop, if_id=if_id)
 
     # Using accending frequency for all plots.
     if wf.header['foff'] < 0:
@@ -30,7 +33,9 @@ def plot_spectrum(wf, t=0, f_start=None, f_stop=None, logged=False, if_id=0, c=N
     elif t == 'all':
         print("averaging along time axis...")
         # Since the data has been squeezed, the axis for time goes away if only one bin, causing a bug with axis=1
-        if len(plot_data.shape) > 1:
+        if _stats is not None:
+            plot_data = _stats['mean']
+        elif len(plot_data.shape) > 1:
             plot_data = plot_data.mean(axis=0)
         else:
             plot_data = plot_data.mean()
@@ -2,21 +2,25 @@ from .config import *
 from ..utils import rebin, db
 from .plot_utils import calc_extent
 
-def plot_time_series(wf, f_start=None, f_stop=None, if_id=0, logged=True, orientation='h', MJD_time=False, **kwargs):
+def plot_time_series(wf, f_start=None, f_stop=None, if_id=0, logged=True, orientation='h', MJD_time=False, _data=None, _stats=None, **kwargs):
     """ Plot the time series.
 
      Args:
         f_start (float): start frequency, in MHz
         f_stop (float): stop frequency, in MHz
         logged (bool): Plot in linear (False) or dB units (True),
+        _data (tuple): (plot_f, plot_data) from wf.grab_data(), if already grabbed
+        _stats (dict): statistics from plot_utils.calc_plot_stats(), if already calculated
         kwargs: keyword args to be passed to matplotlib imshow()
     """
 
     ax = plt.gca()
-    plot_f, plot_data = wf.grab_data(f_start, f_stop, if_id)
+    plot_f, plot_data = _data if _data is not None else wf.grab_data(f_start, f_stop, if_id=if_id)
 
     # Since the data has been squeezed, the axis for time goes away if only one bin, causing a bug with axis=1
-    if len(plot_data.shape) > 1:
+    if _stats is not None:
+        plot_data = _stats['time_series']
+    elif len(plot_data.shape) > 1:
         plot_data = np.nanmean(plot_data, axis=1)
     else:
         plot_data = np.nanmean(plot_data)
@@ -1,5 +1,15 @@
 from .config import *
 
+def grab_plot_data(wf, f_start=None, f_stop=None, if_id=0):
+    """ Grab the data to plot, see Waterfall.grab_data.
+
+    The data is returned in single precision, which is plenty for display
+    (and no copy is made of the usual float32 data).
+    """
+
+    plot_f, plot_data = wf.grab_data(f_start, f_stop, if_id=if_id)
+    return plot_f, plot_data.astype(np.float32, copy=False)
+
 def calc_extent(self, plot_f=None, plot_t=None, MJD_time=False):
     """ Setup plotting edges.
     """
@@ -15,4 +25,130 @@ def calc_extent(self, plot_f=None, plot_t=None, MJD_time=False):
     else:
         extent = (plot_f_begin, plot_f_end, 0.0, (plot_t_end - plot_t_begin) * 24. * 60. * 60)
 
-    return extent
\ No newline at end of file
+    return extent
+
+def calc_kurtosis(plot_data, block_bytes=4*1024*1024):
+    """ Calculate the (Fisher) kurtosis of each channel along the time axis.
+
+    Equivalent to scipy.stats.kurtosis(plot_data, axis=0, nan_policy='omit'),
+    but computed with a handful of NumPy reductions over blocks of channels.
+
+    Args:
+        plot_data (np.array): data with time along the first axis
+        block_bytes (int): approximate size of the float64 work array, in bytes
+
+    Returns:
+        kurtosis (np.array): kurtosis per channel
+    """
+
+    plot_data = np.asarray(plot_data)
+    out_shape = plot_data.shape[1:]
+    n_ints = plot_data.shape[0]
+    n_chans = int(np.prod(out_shape))
+    plot_data = plot_data.reshape(n_ints, n_chans)
+    chans_per_block = max(1024, block_bytes // max(1, n_ints * 8))
+
+    kurtosis = np.empty(n_chans, dtype='float64')
+
+    for c_start in range(0, n_chans, chans_per_block):
+        c_stop = c_start + chans_per_block
+
+        kurtosis[c_start:c_stop] = _calc_kurtosis_block(plot_data[:, c_start:c_stop])
+
+    return kurtosis.reshape(out_shape)
+
+def _calc_kurtosis_block(block):
+    """ Kurtosis of each column of a 2-D block, see calc_kurtosis() """
+
+    # A float64 work array (float32 powers of ~1e10 data would overflow),
+    # squared in place so the fourth power reuses the second.
+    d = np.array(block, dtype='float64')
+
+    # The NaN-aware means make extra copies, so only use them if there are NaNs
+    mean = np.mean
+    m1 = d.mean(axis=0)
+    if np.isnan(m1).any():
+        mean = np.nanmean
+        m1 = mean(d, axis=0)
+
+    d -= m1
+    d *= d
+    m2 = mean(d, axis=0)
+    d *= d
+    m4 = mean(d, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return m4 / m2**2 - 3.0
+
+def calc_min_max_mean(plot_data, block_bytes=4*1024*1024):
+    """ Calculate the minimum, maximum and mean of each channel along the time axis.
+
+    See calc_plot_stats, which this wraps.
+
+    Args:
+        plot_data (np.array): 2-D data with time along the first axis
+        block_bytes (int): approximate size of each block of channels, in bytes
+
+    Returns:
+        (min, max, mean) (np.arrays): statistics per channel
+    """
+
+    stats = calc_plot_stats(plot_data, kurtosis=False, time_series=False, block_bytes=block_bytes)
+    return stats['min'], stats['max'], stats['mean']
+
+def calc_plot_stats(plot_data, kurtosis=True, time_series=True, block_bytes=4*1024*1024):
+    """ Calculate the statistics shown by plot_all, in a single pass over the data.
+
+    The channels are processed in blocks of roughly block_bytes, and every
+    statistic is taken from a block while it is in cache, rather than reading
+    the whole array once per subplot.
+
+    Args:
+        plot_data (np.array): 2-D data with time along the first axis
+        kurtosis (bool): also calculate the kurtosis of each channel
+        time_series (bool): also calculate the mean of each integration
+        block_bytes (int): approximate size of each block of channels, in bytes
+
+    Returns:
+        stats (dict): per channel 'min', 'max', 'mean' and 'kurtosis' (if requested),
+                      and the NaN-aware mean of each integration, 'time_series' (if requested)
+    """
+
+    n_ints, n_chans = plot_data.shape
+    chans_per_block = max(4096, block_bytes // max(1, n_ints * plot_data.itemsize))
+
+    if np.issubdtype(plot_data.dtype, np.floating):
+        mean_dtype = plot_data.dtype
+    else:
+        mean_dtype = np.float64
+
+    stats = {'min': np.empty(n_chans, dtype=plot_data.dtype),
+             'max': np.empty(n_chans, dtype=plot_data.dtype),
+             'mean': np.empty(n_chans, dtype=mean_dtype)}
+    if kurtosis:
+        stats['kurtosis'] = np.empty(n_chans, dtype='float64')
+
+    if time_series:
+        ts_sum = np.zeros(n_ints, dtype='float64')
+
+    for c_start in range(0, n_chans, chans_per_block):
+        c_stop = c_start + chans_per_block
+        block = plot_data[:, c_start:c_stop]
+        block.min(axis=0, out=stats['min'][c_start:c_stop])
+        block.max(axis=0, out=stats['max'][c_start:c_stop])
+        block.mean(axis=0, out=stats['mean'][c_start:c_stop])
+        if kurtosis:
+            stats['kurtosis'][c_start:c_stop] = _calc_kurtosis_block(block)
+
+        if time_series:
+            ts_sum += block.sum(axis=1, dtype='float64')
+
+    if time_series:
+        stats['time_series'] = ts_sum / n_chans
+
+        # Integrations with NaNs need the NaN-aware mean, which is slower
+        has_nan = np.isnan(ts_sum)
+        if has_nan.any():
+            stats['time_series'][has_nan] = np.nanmean(plot_data[has_nan], axis=1)
+
+    return stats
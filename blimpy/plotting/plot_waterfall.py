@@ -1,9 +1,9 @@
 from .config import *
 from ..utils import rebin, db
-from .plot_utils import calc_extent
+from .plot_utils import grab_plot_data, calc_extent
 
 
-def plot_waterfall(wf, f_start=None, f_stop=None, if_id=0, logged=True, cb=True, MJD_time=False, **kwargs):
+def plot_waterfall(wf, f_start=None, f_stop=None, if_id=0, logged=True, cb=True, MJD_time=False, _data=None, **kwargs):
     """ Plot waterfall of data
 
     Args:
@@ -11,19 +11,17 @@ def plot_waterfall(wf, f_start=None, f_stop=None, if_id=0, logged=True, cb=True,
         f_stop (float): stop frequency, in MHz
         logged (bool): Plot in linear (False) or dB units (True),
         cb (bool): for plotting the colorbar
+        _data (tuple): (plot_f, plot_data) from plot_utils.grab_plot_data(), if already grabbed
         kwargs: keyword args to be passed to matplotlib imshow()
     """
 
-    plot_f, plot_data = wf.grab_data(f_start, f_stop, if_id)
+    plot_f, plot_data = _data if _data is not None else grab_plot_data(wf, f_start, f_stop, if_id=if_id)
 
     # Using accending frequency for all plots.
     if wf.header['foff'] < 0:
         plot_data = plot_data[..., ::-1]  # Reverse data
         plot_f = plot_f[::-1]
 
-    if logged:
-        plot_data = db(plot_data)
-
     # Make sure waterfall plot is under 4k*4k
     dec_fac_x, dec_fac_y = 1, 1
     if plot_data.shape[0] > MAX_IMSHOW_POINTS[0]:
@@ -32,7 +30,13 @@ def plot_waterfall(wf, f_start=None, f_stop=None, if_id=0, logged=True, cb=True,
     if plot_data.shape[1] > MAX_IMSHOW_POINTS[1]:
         dec_fac_y = int(plot_data.shape[1] / MAX_IMSHOW_POINTS[1])
 
-    plot_data = rebin(plot_data, dec_fac_x, dec_fac_y)
+    # rebin() always makes a copy, so skip it when there is nothing to average
+    if dec_fac_x > 1 or dec_fac_y > 1:
+        plot_data = rebin(plot_data, dec_fac_x, dec_fac_y)
+
+    # Take the log of the (much smaller) averaged power, not of every sample
+    if logged:
+        plot_data = db(plot_data)
 
     try:
         plt.title(wf.header['source_name'])
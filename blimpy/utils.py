@@ -6,8 +6,16 @@ import numpy as np
 
 
 def db(x, offset=0):
-    """ Convert linear to dB """
-    return 10 * np.log10(x + offset)
+    """ Convert linear to dB
+
+    The scaling is applied in place to the output of log10, so only one
+    array the size of x is allocated (x itself is never modified).
+    """
+    if offset:
+        x = x + offset
+    out = np.log10(x)
+    out *= 10
+    return out
 
 
 def lin(x):
@@ -21,6 +29,35 @@ def closest(xarr, val):
     return idx_closest
 
 
+def closest_regular(xarr, val):
+    """ Return the index of the closest in a regularly spaced xarr to value val
+
+    Same result as closest(), but the index is computed from the spacing (and only the
+    neighbouring values are checked), so it does not scan the whole array.
+    """
+    n = len(xarr)
+    if n < 2:
+        return 0
+
+    step = (xarr[-1] - xarr[0]) / (n - 1)
+    idx = int(np.clip(np.round((val - xarr[0]) / step), 0, n - 1))
+
+    # Guard against rounding at the half-way points
+    i0, i1 = max(idx - 1, 0), min(idx + 2, n)
+    return i0 + int(np.argmin(np.abs(np.asarray(xarr[i0:i1]) - val)))
+
+
+def replace_suffix(name, old, new):
+    """ Replace the suffix old of name by new (or just append new if name does not end in old)
+
+    Unlike str.replace, occurrences of old elsewhere in the name are left alone,
+    e.g. 'blc.filtered.fil' -> 'blc.filtered.h5'.
+    """
+    if old and name.endswith(old):
+        name = name[:-len(old)]
+    return name + new
+
+
 def rebin(d, n_x=None, n_y=None, n_z=None):
     """ Rebin data by averaging bins together
 
@@ -36,17 +73,16 @@ def rebin(d, n_x=None, n_y=None, n_z=None):
     n_y = 1 if n_y is None else n_y
     n_z = 1 if n_z is None else n_z
 
+    # Average over all binned axes in a single reduction, rather than one pass
+    # (and one temporary array) per axis.
     if d.ndim == 3:
         d = d[:int(d.shape[0] // n_x) * n_x, :int(d.shape[1] // n_y) * n_y, :int(d.shape[2] // n_z) * n_z]
         d = d.reshape((d.shape[0] // n_x, n_x, d.shape[1] // n_y, n_y, d.shape[2] // n_z, n_z))
-        d = d.mean(axis=5)
-        d = d.mean(axis=3)
-        d = d.mean(axis=1)
+        d = d.mean(axis=(1, 3, 5))
     elif d.ndim == 2:
         d = d[:int(d.shape[0] // n_x) * n_x, :int(d.shape[1] // n_y) * n_y]
         d = d.reshape((d.shape[0] // n_x, n_x, d.shape[1] // n_y, n_y))
-        d = d.mean(axis=3)
-        d = d.mean(axis=1)
+        d = d.mean(axis=(1, 3))
     elif d.ndim == 1:
         d = d[:int(d.shape[0] // n_x) * n_x]
         d = d.reshape((d.shape[0] // n_x, n_x))
@@ -56,6 +92,58 @@ def rebin(d, n_x=None, n_y=None, n_z=None):
     return d
 
 
+def quantize_sigma(data):
+    """ Robust estimate of the noise in each channel, as used by quantize().
+
+    Args:
+        data (np.array): floating point data, with time as the first axis
+
+    Returns:
+        sigma: noise of each channel (1.4826 times the median absolute deviation
+               along time), with the time axis kept as length one
+    """
+    data = np.asarray(data)
+    med = np.median(data, axis=0, keepdims=True)
+    return 1.4826 * np.median(np.abs(data - med), axis=0, keepdims=True)
+
+
+def quantize(data, frac_var=1e-3, sigma=None):
+    """ Reduce the precision of the data so that it compresses better.
+
+    Each channel is rounded to a multiple of the largest power of two for which the
+    added rounding noise is at most frac_var times the channel's noise variance
+    (Masui et al. 2015, Astronomy and Computing 12, 181). Bitshuffle then sees
+    many more zero bits in the mantissa.
+
+    Args:
+        data (np.array): floating point data, with time as the first axis
+        frac_var (float): allowed fractional increase in the noise variance
+        sigma (np.array or None): noise of each channel, see quantize_sigma. Give it when
+                                  data is only part of the integrations (e.g. one blob),
+                                  so that the result does not depend on how it was split.
+                                  Default: estimated from data
+
+    Returns:
+        d: quantized data, with the same shape and dtype
+    """
+    data = np.asarray(data)
+    if not np.issubdtype(data.dtype, np.floating) or data.ndim < 2:
+        return data
+
+    if sigma is None:
+        sigma = quantize_sigma(data)
+
+    # Rounding to a step g adds a variance of g**2 / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exponent = np.floor(np.log2(sigma * np.sqrt(12 * frac_var)))
+    valid = np.isfinite(exponent)
+    exponent = np.where(valid, exponent, 0).astype('int32')
+
+    d = np.ldexp(np.round(np.ldexp(data, -exponent)), exponent)
+    d = np.where(valid, d, data)
+    return d.astype(data.dtype, copy=False)
+
+
 def unpack(data, nbit):
     """upgrade data from nbits to 8bits
 
@@ -24,10 +24,11 @@ TODO: check the file seek logic works correctly for multiple IFs
 import sys
 import os
 import numpy as np
-import six
+from collections import OrderedDict
 
 from blimpy.io import file_wrapper as fw
-from .plotting import *
+from blimpy.io.hdf_writer import COMPRESSION_TYPES
+from .utils import closest_regular
 
 from astropy.time import Time
 from astropy import units as u
@@ -53,6 +54,47 @@ logging.basicConfig(format=format,stream=stream,level = level_log)
 #import pdb #pdb.set_trace()
 
 MAX_BLOB_MB = 1024
+MAX_GRAB_CACHE = 8
+
+# Chunk dimensions by data product, checked in order: the first header value
+# (absolute) below the limit wins.
+CHUNK_DIMS = (
+    ('foff',  1e-5, (1,1,1048576), 'high frequency resolution'),   # Usually '.0000.' in filename. 1048576 channels per coarse channel
+    ('tsamp', 1e-3, (2048,1,512),  'high time resolution'),        # Usually '.0001.' in filename. 512 channels per single band (ie. blc00)
+    ('foff',  1e-2, (10,1,65536),  'intermediate frequency and time resolution'),  # Usually '.0002.' in filename. 65536 channels per single band
+)
+
+# Number of values per chunk (1 MiB of float32) for data products not in CHUNK_DIMS
+CHUNK_TARGET_VALUES = 2**18
+
+
+
+# Plots for the -p option of cmd_tool: (figure name, figure kwargs, Waterfall method, method kwargs)
+CMD_PLOTS = {
+    'w':   ('waterfall', {'figsize': (8, 6)}, 'plot_waterfall', {}),
+    's':   ('Spectrum', {'figsize': (8, 6)}, 'plot_spectrum', {'logged': True, 't': 'all'}),
+    'mm':  ('min max', {'figsize': (8, 6)}, 'plot_spectrum_min_max', {'logged': True, 't': 'all'}),
+    'k':   ('kurtosis', {'figsize': (8, 6)}, 'plot_kurtosis', {}),
+    't':   ('Time Series', {'figsize': (8, 6)}, 'plot_time_series', {'orientation': 'h'}),
+    'a':   ('Multiple diagnostic plots', {'figsize': (12, 9), 'facecolor': 'white'}, 'plot_all', {'logged': True, 't': 'all'}),
+    'ank': ('Multiple diagnostic plots', {'figsize': (12, 9), 'facecolor': 'white'}, 'plot_all', {'logged': True, 't': 'all', 'kurtosis': False}),
+}
+
+
+def _plotting_method(name):
+    """ Make a Waterfall method calling blimpy.plotting.<name>.
+
+    blimpy.plotting (and with it matplotlib) is only imported when the method is
+    first called, so that reading and converting files does not pay for it.
+    """
+
+    def method(self, *args, **kwargs):
+        from . import plotting
+        return getattr(plotting, name)(self, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = "See blimpy.plotting.%s" % name
+    return method
 
 
 ###
@@ -65,6 +107,14 @@ class Waterfall(object):
     def __repr__(self):
         return "Waterfall data: %s" % self.filename
 
+    # Plotting methods
+    plot_spectrum         = _plotting_method('plot_spectrum')
+    plot_waterfall        = _plotting_method('plot_waterfall')
+    plot_kurtosis         = _plotting_method('plot_kurtosis')
+    plot_time_series      = _plotting_method('plot_time_series')
+    plot_all              = _plotting_method('plot_all')
+    plot_spectrum_min_max = _plotting_method('plot_spectrum_min_max')
+
     def __init__(self, filename=None, f_start=None, f_stop=None, t_start=None, t_stop=None,
                  load_data=True, max_load=1., header_dict=None, data_array=None):
         """ Class for loading and plotting blimpy data.
@@ -90,6 +140,12 @@ class Waterfall(object):
 
 ##EE        super(Waterfall, self).__init__()
 
+        # Recent grab_data() results, and the data array they are views of. The cache is
+        # cleared whenever the data selection is re-read, or self.data is reassigned.
+        self._grab_cache = OrderedDict()
+        self._grab_cache_data = None
+        self._n_coarse_chan = None
+
         if filename:
             self.filename = filename
             self.ext = os.path.splitext(filename)[-1].lower()
@@ -123,18 +179,33 @@ class Waterfall(object):
         else:
             self.filename = ''
 
-        # Attach methods
-        self.plot_spectrum         = six.create_bound_method(plot_spectrum, self)
-        self.plot_waterfall        = six.create_bound_method(plot_waterfall, self)
-        self.plot_kurtosis         = six.create_bound_method(plot_kurtosis, self)
-        self.plot_time_series      = six.create_bound_method(plot_time_series, self)
-        self.plot_all              = six.create_bound_method(plot_all, self)
-        self.plot_spectrum_min_max = six.create_bound_method(plot_spectrum_min_max, self)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ Release the data, and close the file (if any).
+
+        Can also be done by using the Waterfall as a context manager:
+            with Waterfall('filename_here.h5') as fb:
+                fb.plot_spectrum()
+        """
+
+        self.data = None
+        self._grab_cache.clear()
+        self._grab_cache_data = None
+        if hasattr(self, 'container'):
+            self.container.close()
 
     def __load_data(self):
         """ Helper for loading data from a container. Should not be called manually. """
 
         self.data = self.container.data
+        self._grab_cache.clear()
+        self._grab_cache_data = None
+        self._n_coarse_chan = None
 
     def read_data(self, f_start=None, f_stop=None,t_start=None, t_stop=None):
         """ Reads data selection if small enough.
@@ -223,6 +294,10 @@ class Waterfall(object):
             freq_axis_size = self.selection_shape[self.freq_axis]
             time_axis_size = np.min([chunk_dim[self.time_axis] * MAX_BLOB_MB * chunk_dim[self.freq_axis] / freq_axis_size, self.selection_shape[self.time_axis]])
 
+            # Whole chunks in time, so that blobs are written without partial chunk updates
+            if chunk_dim[self.time_axis] < time_axis_size < self.selection_shape[self.time_axis]:
+                time_axis_size -= time_axis_size % chunk_dim[self.time_axis]
+
         blob_dim = (int(time_axis_size), 1, freq_axis_size)
 
         return blob_dim
@@ -236,26 +311,18 @@ class Waterfall(object):
             Returns chunk dimensions, e.g. (2048, 1, 512)
         """
 
-        #Usually '.0000.' is in self.filename
-        if np.abs(self.header['foff']) < 1e-5:
-            logger.info('Detecting high frequency resolution data.')
-            chunk_dim = (1,1,1048576) #1048576 is the number of channels in a coarse channel.
-            return chunk_dim
-        #Usually '.0001.' is in self.filename
-        elif np.abs(self.header['tsamp']) < 1e-3:
-            logger.info('Detecting high time resolution data.')
-            chunk_dim = (2048,1,512) #512 is the total number of channels per single band (ie. blc00)
-            return chunk_dim
-        #Usually '.0002.' is in self.filename
-        elif np.abs(self.header['foff']) < 1e-2 and np.abs(self.header['foff'])  >= 1e-5:
-            logger.info('Detecting intermediate frequency and time resolution data.')
-            chunk_dim = (10,1,65536)  #65536 is the total number of channels per single band (ie. blc00)
-#            chunk_dim = (1,1,65536/4)
-            return chunk_dim
-        else:
-            logger.warning('File format not known. Will use minimum chunking. NOT OPTIMAL.')
-            chunk_dim = (1,1,512)
-            return chunk_dim
+        for key, max_value, chunk_dim, description in CHUNK_DIMS:
+            if np.abs(self.header[key]) < max_value:
+                logger.info('Detecting %s data.' % description)
+                return chunk_dim
+
+        # Tiny chunks make for a huge B-tree and slow reads, so aim for about 1 MiB,
+        # keeping whole spectra in a chunk where possible.
+        logger.warning('File format not known. Will use chunks of about 1 MiB, which may not be optimal.')
+        n_chans = max(1, int(self.header['nchans']))
+        chan_chunk = min(n_chans, CHUNK_TARGET_VALUES)
+        chunk_dim = (max(1, CHUNK_TARGET_VALUES // chan_chunk), 1, chan_chunk)
+        return chunk_dim
 
     def calc_n_coarse_chan(self, chan_bw=None):
         """ This makes an attempt to calculate the number of coarse channels in a given freq selection.
@@ -267,22 +334,54 @@ class Waterfall(object):
             Returns n_coarse_chan (int), number of coarse channels
         """
 
+        if chan_bw is None:
+            return self.n_coarse_chan
+
         n_coarse_chan = self.container.calc_n_coarse_chan(chan_bw)
 
         return n_coarse_chan
 
+    @property
+    def n_coarse_chan(self):
+        """ Number of coarse channels in the freq selection, see calc_n_coarse_chan().
+
+            Computed once, and again only when the data selection is re-read.
+        """
+
+        # Stored in a tuple, as None is a valid (unknown) result
+        if self._n_coarse_chan is None:
+            self._n_coarse_chan = (self.container.calc_n_coarse_chan(),)
+
+        return self._n_coarse_chan[0]
+
     def grab_data(self, f_start=None, f_stop=None,t_start=None, t_stop=None, if_id=0):
         """ Extract a portion of data by frequency range.
 
         Args:
             f_start (float): start frequency in MHz
             f_stop (float): stop frequency in MHz
+            t_start (int): start integration ID
+            t_stop (int): stop integration ID
             if_id (int): IF input identification (req. when multiple IFs in file)
 
         Returns:
-            (freqs, data) (np.arrays): frequency axis in MHz and data subset
+            (freqs, data) (np.arrays): frequency axis in MHz and data subset,
+                                       as a (time, freq) plane of the selected IF
+
+        Note: the last few results are cached, so repeated calls (e.g. from plot_all)
+        return the same arrays without re-slicing.
         """
 
+        # Only views of the current self.data are cached, so that a reassigned
+        # array is not kept alive by the cache.
+        if self._grab_cache_data is not self.data:
+            self._grab_cache.clear()
+            self._grab_cache_data = self.data
+
+        key = (f_start, f_stop, t_start, t_stop, if_id)
+        if key in self._grab_cache:
+            return self._grab_cache[key]
+
         try:
             self.freqs = self.container.populate_freqs()
         except:
@@ -298,18 +397,24 @@ class Waterfall(object):
             f_stop = self.freqs[-1]
 
         try:
-            i0 = np.argmin(np.abs(self.freqs - f_start))
-            i1 = np.argmin(np.abs(self.freqs - f_stop))
+            i0 = closest_regular(self.freqs, f_start)
+            i1 = closest_regular(self.freqs, f_stop)
 
+            # Select a single IF, so that the data is a (time, freq) plane with the
+            # frequency axis contiguous in memory.
             if i0 < i1:
                 plot_f    = self.freqs[i0:i1 + 1]
-                plot_data = np.squeeze(self.data[t_start:t_stop, ..., i0:i1 + 1])
+                plot_data = np.squeeze(self.data[t_start:t_stop, if_id, i0:i1 + 1])
             else:
                 plot_f    = self.freqs[i1:i0 + 1]
-                plot_data = np.squeeze(self.data[t_start:t_stop, ..., i1:i0 + 1])
+                plot_data = np.squeeze(self.data[t_start:t_stop, if_id, i1:i0 + 1])
         except:
             raise Exception("Waterfall.grab_data: Too much data requested")
 
+        self._grab_cache[key] = (plot_f, plot_data)
+        if len(self._grab_cache) > MAX_GRAB_CACHE:
+            self._grab_cache.popitem(last=False)
+
         return plot_f, plot_data
 
     def write_to_fil(self, filename_out, *args, **kwargs):
@@ -339,13 +444,34 @@ class Waterfall(object):
         n_coarse_chan = int(n_coarse_chan)
 
         n_chan = self.data.shape[-1]
-        n_chan_per_coarse = int(n_chan / n_coarse_chan)
-
-        mid_chan = int(n_chan_per_coarse / 2)
-
-        for ii in range(n_coarse_chan):
-            ss = ii*n_chan_per_coarse
-            self.data[..., ss+mid_chan] = np.median(self.data[..., ss+mid_chan+5:ss+mid_chan+10])
+        n_chan_per_coarse = n_chan // n_coarse_chan
+
+        mid_chan = n_chan_per_coarse // 2
+
+        # Index the DC bin of every coarse channel, and the bins 5 to 9 channels above it
+        # (which run into the next coarse channel when they are narrow), so only those
+        # elements are read and written.
+        dc_idx = np.arange(n_coarse_chan) * n_chan_per_coarse + mid_chan
+        neighbour_idx = dc_idx[:, np.newaxis] + np.arange(5, 10)
+
+        # Only the last coarse channels can run past the top of the band
+        n_full = int(np.count_nonzero(neighbour_idx[:, -1] < n_chan))
+        medians = np.empty(n_coarse_chan, dtype='float64')
+        if n_full:
+            neighbours = np.moveaxis(self.data[..., neighbour_idx[:n_full]], -2, 0)
+            medians[:n_full] = np.median(neighbours.reshape(n_full, -1), axis=1)
+
+        for ii in range(n_full, n_coarse_chan):
+            # Use the bins that are left, or else the same bins below the DC bin
+            idx = neighbour_idx[ii][neighbour_idx[ii] < n_chan]
+            if not idx.size:
+                idx = dc_idx[ii] - np.arange(5, 10)
+                idx = idx[idx >= 0]
+            if not idx.size:
+                raise ValueError('blank_dc: %i channels are too few to estimate the DC bins from.' % n_chan)
+            medians[ii] = np.median(self.data[..., idx])
+
+        self.data[..., dc_idx] = medians
 
     def calibrate_band_pass_N1(self):
         """ One way to calibrate the band pass is to take the median value
@@ -368,36 +494,50 @@ def cmd_tool(args=None):
 
     parser.add_argument('filename', type=str,
                         help='Name of file to read')
-    parser.add_argument('-p', action='store',  default='a', dest='what_to_plot', type=str,
-                        help='Show: "w" waterfall (freq vs. time) plot; "s" integrated spectrum plot; \
-                        "t" for time series; "mm" for spectrum including min max; "k" for kurtosis; \
-                        "a" for all available plots and information; and "ank" for all but kurtosis.')
-    parser.add_argument('-b', action='store', default=None, dest='f_start', type=float,
+    # Options are grouped by what they are for, so that --help tells a conversion from a plot
+    selection = parser.add_argument_group('data selection')
+    selection.add_argument('-b', action='store', default=None, dest='f_start', type=float,
                         help='Start frequency (begin), in MHz')
-    parser.add_argument('-e', action='store', default=None, dest='f_stop', type=float,
+    selection.add_argument('-e', action='store', default=None, dest='f_stop', type=float,
                         help='Stop frequency (end), in MHz')
-    parser.add_argument('-B', action='store', default=None, dest='t_start', type=int,
+    selection.add_argument('-B', action='store', default=None, dest='t_start', type=int,
                         help='Start integration (begin, inclusive) ID ')
-    parser.add_argument('-E', action='store', default=None, dest='t_stop', type=int,
+    selection.add_argument('-E', action='store', default=None, dest='t_stop', type=int,
                         help='Stop integration (end, exclusive) ID')
-    parser.add_argument('-i', action='store_true', default=False, dest='info_only',
+    selection.add_argument('-l', action='store', default=None, dest='max_load', type=float,
+                        help='Maximum data limit to load. Default:1GB')
+
+    info = parser.add_argument_group('file information')
+    info.add_argument('-i', action='store_true', default=False, dest='info_only',
                         help='Show info only')
-    parser.add_argument('-a', action='store_true', default=False, dest='average',
+    info.add_argument('-q', action='store_true', default=False, dest='quiet',
+                        help='Do not show info (unless -i is given), e.g. for batch conversions.')
+
+    plotting = parser.add_argument_group('plotting')
+    plotting.add_argument('-p', action='store',  default='a', dest='what_to_plot', type=str,
+                        help='Show: "w" waterfall (freq vs. time) plot; "s" integrated spectrum plot; \
+                        "t" for time series; "mm" for spectrum including min max; "k" for kurtosis; \
+                        "a" for all available plots and information; and "ank" for all but kurtosis.')
+    plotting.add_argument('-a', action='store_true', default=False, dest='average',
                        help='average along time axis (plot spectrum only)')
-    parser.add_argument('-s', action='store', default='', dest='plt_filename', type=str,
+    plotting.add_argument('-s', action='store', default='', dest='plt_filename', type=str,
                        help='save plot graphic to file (give filename as argument)')
-    parser.add_argument('-S', action='store_true', default=False, dest='save_only',
+    plotting.add_argument('-S', action='store_true', default=False, dest='save_only',
                        help='Turn off plotting of data and only save to file.')
-    parser.add_argument('-D', action='store_false', default=False, dest='blank_dc',
+    plotting.add_argument('-D', action='store_false', default=False, dest='blank_dc',
                        help='Use to not blank DC bin.')
-    parser.add_argument('-H', action='store_true', default=False, dest='to_hdf5',
+
+    conversion = parser.add_argument_group('conversion')
+    out_format = conversion.add_mutually_exclusive_group()
+    out_format.add_argument('-H', action='store_true', default=False, dest='to_hdf5',
                        help='Write file to hdf5 format.')
-    parser.add_argument('-F', action='store_true', default=False, dest='to_fil',
+    out_format.add_argument('-F', action='store_true', default=False, dest='to_fil',
                        help='Write file to .fil format.')
-    parser.add_argument('-o', action='store', default=None, dest='filename_out', type=str,
+    conversion.add_argument('-o', action='store', default=None, dest='filename_out', type=str,
                         help='Filename output (if not provided, the name will be the same but with appropriate extension).')
-    parser.add_argument('-l', action='store', default=None, dest='max_load', type=float,
-                        help='Maximum data limit to load. Default:1GB')
+    conversion.add_argument('--compress', action='store', default='bitshuffle', dest='compression', type=str,
+                        choices=COMPRESSION_TYPES,
+                        help='Compression of the hdf5 output (with -H). Default: bitshuffle')
 
     if args is None:
         args = sys.argv[1:]
@@ -406,84 +546,63 @@ def cmd_tool(args=None):
 
     # Open blimpy data
     filename = parse_args.filename
-    load_data = not parse_args.info_only
+    # Conversions stream the data from the file, so only read the header
+    load_data = not (parse_args.info_only or parse_args.to_hdf5 or parse_args.to_fil)
     info_only = parse_args.info_only
     filename_out = parse_args.filename_out
 
-    fil = Waterfall(filename, f_start=parse_args.f_start, f_stop=parse_args.f_stop, t_start=parse_args.t_start, t_stop=parse_args.t_stop, load_data=load_data, max_load=parse_args.max_load)
-    fil.info()
-
-    #Check the size of selection.
-    if fil.container.isheavy() or parse_args.to_hdf5 or parse_args.to_fil:
-        info_only = True
-
-    # And if we want to plot data, then plot data.
-    if not info_only:
-        from .plotting.config import plt
-
-        print('')
-
-        if parse_args.blank_dc:
-            logger.info("Blanking DC bin")
-            n_coarse_chan = fil.calc_n_coarse_chan()
-            fil.blank_dc(n_coarse_chan)
-
-        if parse_args.what_to_plot == "w":
-            plt.figure("waterfall", figsize=(8, 6))
-            fil.plot_waterfall(f_start=parse_args.f_start, f_stop=parse_args.f_stop)
-        elif parse_args.what_to_plot == "s":
-            plt.figure("Spectrum", figsize=(8, 6))
-            fil.plot_spectrum(logged=True, f_start=parse_args.f_start, f_stop=parse_args.f_stop, t='all')
-        elif parse_args.what_to_plot == "mm":
-            plt.figure("min max", figsize=(8, 6))
-            fil.plot_spectrum_min_max(logged=True, f_start=parse_args.f_start, f_stop=parse_args.f_stop, t='all')
-        elif parse_args.what_to_plot == "k":
-            plt.figure("kurtosis", figsize=(8, 6))
-            fil.plot_kurtosis(f_start=parse_args.f_start, f_stop=parse_args.f_stop)
-        elif parse_args.what_to_plot == "t":
-            plt.figure("Time Series", figsize=(8, 6))
-            fil.plot_time_series(f_start=parse_args.f_start, f_stop=parse_args.f_stop,orientation='h')
-        elif parse_args.what_to_plot == "a":
-            plt.figure("Multiple diagnostic plots", figsize=(12, 9),facecolor='white')
-            fil.plot_all(logged=True, f_start=parse_args.f_start, f_stop=parse_args.f_stop, t='all')
-        elif parse_args.what_to_plot == "ank":
-            plt.figure("Multiple diagnostic plots", figsize=(12, 9),facecolor='white')
-            fil.plot_all(logged=True, f_start=parse_args.f_start, f_stop=parse_args.f_stop, t='all',kutosis=False)
-
-        if parse_args.plt_filename != '':
-            plt.savefig(parse_args.plt_filename)
-
-        if not parse_args.save_only:
-            if 'DISPLAY' in os.environ.keys():
-                plt.show()
-            else:
-                logger.warning("No $DISPLAY available.")
+    # The data and the file are released on exit, also when cmd_tool is called from a script
+    with Waterfall(filename, f_start=parse_args.f_start, f_stop=parse_args.f_stop, t_start=parse_args.t_start, t_stop=parse_args.t_stop, load_data=load_data, max_load=parse_args.max_load) as fil:
+        if info_only or not parse_args.quiet:
+            fil.info()
+
+        #Check the size of selection.
+        if fil.container.isheavy() or parse_args.to_hdf5 or parse_args.to_fil:
+            info_only = True
 
-    else:
+        # And if we want to plot data, then plot data.
+        if not info_only:
+            from .plotting.config import plt
 
-        fileroot = os.path.splitext(filename)[0]
+            print('')
+
+            if parse_args.blank_dc:
+                logger.info("Blanking DC bin")
+                fil.blank_dc(fil.n_coarse_chan)
+
+            if parse_args.what_to_plot in CMD_PLOTS:
+                fig_name, fig_kwargs, plot_name, plot_kwargs = CMD_PLOTS[parse_args.what_to_plot]
+                plt.figure(fig_name, **fig_kwargs)
+                getattr(fil, plot_name)(f_start=parse_args.f_start, f_stop=parse_args.f_stop, **plot_kwargs)
+
+            if parse_args.plt_filename != '':
+                plt.savefig(parse_args.plt_filename)
+
+            if not parse_args.save_only:
+                if 'DISPLAY' in os.environ:
+                    plt.show()
+                else:
+                    logger.warning("No $DISPLAY available.")
+
+        else:
 
-        if parse_args.to_hdf5 and parse_args.to_fil:
-            # If this is the last statement anyway,
-            # and consequently, an output file is not generated,
-            # why do we not raise an error?
-            raise Warning('Either provide to_hdf5 or to_fil, but not both.')
+            fileroot = os.path.splitext(filename)[0]
 
-        elif parse_args.to_hdf5:
-            if not filename_out:
-                filename_out = fileroot + '.h5'
+            if parse_args.to_hdf5:
+                if not filename_out:
+                    filename_out = fileroot + '.h5'
 
-            logger.info('Writing file : %s'% filename_out)
-            fil.write_to_hdf5(filename_out)
-            logger.info('File written.')
+                logger.info('Writing file : %s'% filename_out)
+                fil.write_to_hdf5(filename_out, compression=parse_args.compression)
+                logger.info('File written.')
 
-        elif parse_args.to_fil:
-            if not filename_out:
-                filename_out = fileroot + '.fil'
+            elif parse_args.to_fil:
+                if not filename_out:
+                    filename_out = fileroot + '.fil'
 
-            logger.info('Writing file : %s'% filename_out)
-            fil.write_to_fil(filename_out)
-            logger.info('File written.')
+                logger.info('Writing file : %s'% filename_out)
+                fil.write_to_fil(filename_out)
+                logger.info('File written.')
 
 
 if __name__ == "__main__":
@@ -3,6 +3,11 @@
 
 """
 
+import os
+import threading
+import h5py
+import numpy as np
+import pytest
 import blimpy as bl
 from tests.data import voyager_fil, voyager_h5
 
@@ -11,5 +16,66 @@ def test_max_data_array_size():
     fw = bl.Waterfall(voyager_fil, max_load=0.001)
     fw = bl.Waterfall(voyager_h5,  max_load=0.001)
 
+def test_read_blob_truncated_fil():
+    """ A .fil file with a partial sample at the end must still be read by blobs """
+    import shutil
+
+    shutil.copyfile(voyager_fil, 'test_truncated.fil')
+    with open('test_truncated.fil', 'ab') as f:
+        f.write(b'\x00\x00')
+
+    selection = {'f_start': 8419.24, 'f_stop': 8419.35}
+    a = bl.Waterfall('test_truncated.fil', load_data=False, **selection)
+    blob = a.container.read_blob((4, 1, a.selection_shape[2]))
+    assert np.array_equal(blob, bl.Waterfall(voyager_fil, **selection).data[:4])
+    os.remove('test_truncated.fil')
+
+def test_precision_reduce_heavy_matches_light(monkeypatch):
+    """ The noise used to quantize must not depend on how the data is split into blobs """
+    monkeypatch.setattr(bl.waterfall, 'MAX_BLOB_MB', 1)  # One integration per blob
+
+    for filename in (voyager_h5, voyager_fil):
+        for kwargs in ({}, {'f_scrunch': 8}):
+            bl.Waterfall(filename).write_to_hdf5('test_light.h5', precision_reduce=True, **kwargs)
+            bl.Waterfall(filename, load_data=False).write_to_hdf5('test_heavy.h5', precision_reduce=True, **kwargs)
+            with h5py.File('test_light.h5', 'r') as light, h5py.File('test_heavy.h5', 'r') as heavy:
+                assert np.array_equal(light['data'][:], heavy['data'][:])
+    os.remove('test_light.h5')
+    os.remove('test_heavy.h5')
+
+def test_f_scrunch_chunks_heavy_matches_light():
+    """ Scrunched light and heavy writes must pick the same chunks """
+    bl.Waterfall(voyager_h5).write_to_hdf5('test_light.h5', f_scrunch=8)
+    bl.Waterfall(voyager_h5, load_data=False).write_to_hdf5('test_heavy.h5', f_scrunch=8)
+    with h5py.File('test_light.h5', 'r') as light, h5py.File('test_heavy.h5', 'r') as heavy:
+        assert light['data'].chunks == heavy['data'].chunks == (1, 1, 131072)
+        assert light['data'].attrs['foff'] == heavy['data'].attrs['foff']
+    os.remove('test_light.h5')
+    os.remove('test_heavy.h5')
+
+def test_blob_reader_stops_on_error(monkeypatch):
+    """ The blob reader thread must not outlive a failed heavy write """
+    from blimpy import utils
+
+    monkeypatch.setattr(bl.waterfall, 'MAX_BLOB_MB', 1)  # One integration per blob
+    n_calls = []
+
+    def failing_quantize(data, *args, **kwargs):
+        n_calls.append(1)
+        if len(n_calls) == 3:
+            raise IOError('Injected failure')
+        return data
+    monkeypatch.setattr(utils, 'quantize', failing_quantize)
+
+    a = bl.Waterfall(voyager_h5, load_data=False)
+    with pytest.raises(IOError):
+        a.write_to_hdf5('test_heavy_error.h5', precision_reduce=True)
+    os.remove('test_heavy_error.h5')
+
+    for thread in threading.enumerate():
+        if thread.name == 'blimpy-read-blobs':
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
 if __name__ == "__main__":
     test_max_data_array_size()
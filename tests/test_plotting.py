@@ -6,6 +6,8 @@ import pylab as plt
 from tests.data import voyager_fil, voyager_h5
 from blimpy.plotting import plot_waterfall, plot_spectrum, plot_spectrum_min_max, \
     plot_kurtosis, plot_time_series, plot_all
+from blimpy.plotting.plot_utils import calc_kurtosis, calc_min_max_mean, calc_plot_stats
+import scipy.stats
 
 
 def test_plot_waterfall():
@@ -66,6 +68,44 @@ def test_plot_waterfall_classmethod():
     plt.savefig("test_plotting_plot_all_classmethod.png")
 
 
+def test_calc_kurtosis():
+    """ Compare vectorised kurtosis against scipy, including NaN handling """
+
+    data = np.random.random((64, 128)).astype('float32') * 1e10
+    data[3, 5] = np.nan
+
+    expected = scipy.stats.kurtosis(data.astype('float64'), axis=0, nan_policy='omit')
+    assert np.allclose(calc_kurtosis(data), expected)
+
+
+def test_calc_min_max_mean():
+    """ Compare blocked min / max / mean against the separate NumPy reductions """
+
+    data = np.random.random((16, 10000)).astype('float32')
+    plot_min, plot_max, plot_mean = calc_min_max_mean(data, block_bytes=1024)
+
+    assert np.array_equal(plot_min, data.min(axis=0))
+    assert np.array_equal(plot_max, data.max(axis=0))
+    assert np.allclose(plot_mean, data.mean(axis=0))
+
+
+def test_calc_plot_stats():
+    """ Compare the single-pass plot_all statistics against the separate reductions """
+
+    data = np.random.random((16, 10000)).astype('float32')
+    data[3, 5] = np.nan
+    stats = calc_plot_stats(data, block_bytes=1024)
+
+    assert np.array_equal(stats['min'], data.min(axis=0), equal_nan=True)
+    assert np.array_equal(stats['max'], data.max(axis=0), equal_nan=True)
+    assert np.allclose(stats['mean'], data.mean(axis=0), equal_nan=True)
+    assert np.allclose(stats['kurtosis'], calc_kurtosis(data), equal_nan=True)
+    assert np.allclose(stats['time_series'], np.nanmean(data, axis=1))
+
+
 if __name__ == "__main__":
     test_plot_waterfall()
-    test_plot_waterfall_classmethod()
\ No newline at end of file
+    test_plot_waterfall_classmethod()
+    test_calc_kurtosis()
+    test_calc_min_max_mean()
+    test_calc_plot_stats()
\ No newline at end of file
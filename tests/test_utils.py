@@ -7,6 +7,19 @@ def test_utils():
     assert utils.db(100) == 20.0
     assert utils.lin(20)  == 100.0
     assert utils.closest(np.array([0,1,2,3,4,5]), 2.2) == 2
+    assert utils.closest_regular(np.array([0,1,2,3,4,5]), 2.2) == 2
+
+def test_closest_regular():
+    # Descending frequency axis, as for foff < 0
+    freqs = -2.7939677238464355e-06 * np.arange(1024) + 8421.38671875
+    for val in np.random.uniform(freqs[-1] - 1e-5, freqs[0] + 1e-5, 100):
+        assert utils.closest_regular(freqs, val) == utils.closest(freqs, val)
+    assert utils.closest_regular(freqs[:1], 8421.0) == 0
+
+def test_replace_suffix():
+    assert utils.replace_suffix('blc.filtered.fil', '.fil', '.h5') == 'blc.filtered.h5'
+    assert utils.replace_suffix('voyager.h5', '.h5', '.scrunched.h5') == 'voyager.scrunched.h5'
+    assert utils.replace_suffix('voyager', '.fil', '.h5') == 'voyager.h5'
 
 def test_rebin():
     # 1D
@@ -37,7 +50,25 @@ def test_rebin():
     with pytest.raises(RuntimeError):
         utils.rebin(c, 2, 2)
 
+def test_quantize():
+    d = (np.random.standard_normal((256, 1, 64)) * 1e8 + 1e10).astype('float32')
+    q = utils.quantize(d, frac_var=1e-3)
+    assert q.dtype == d.dtype
+    assert q.shape == d.shape
+    assert np.var(q - d) / np.var(d) < 1e-3
+
+    # With the noise of the whole data, any subset of integrations is quantized the same way
+    sigma = utils.quantize_sigma(d)
+    assert np.array_equal(utils.quantize(d[:1], sigma=sigma), q[:1])
+
+    # Integer data and single spectra are returned untouched
+    i = np.arange(10, dtype='uint8').reshape((10, 1, 1))
+    assert utils.quantize(i) is i
+    assert np.array_equal(utils.quantize(d[0, 0]), d[0, 0])
+
 
 if __name__ == "__main__":
     test_utils()
-    test_rebin()
\ No newline at end of file
+    test_closest_regular()
+    test_rebin()
+    test_quantize()
\ No newline at end of file
@@ -1,6 +1,9 @@
-from tests.data import voyager_h5
+from tests.data import voyager_h5, voyager_fil
 import blimpy as bl
 import os
+import gc
+import weakref
+import numpy as np
 
 import pytest
 
@@ -20,6 +23,119 @@ def test_info():
     a._get_blob_dimensions((300, 300, 300, 300))
     a._update_header()
 
+def test_blank_dc():
+    """ Check the vectorised DC blanking against a per-coarse-channel loop """
+    # Narrow coarse channels read into the next one, and the last one has
+    # to fall back to the bins below its DC bin.
+    for n_coarse_chan, n_chan_per_coarse in ((4, 32), (8, 10), (4, 13)):
+        n_chan = n_coarse_chan * n_chan_per_coarse
+        mid_chan = n_chan_per_coarse // 2
+        data = np.random.random((16, 1, n_chan)).astype('float32')
+
+        expected = data.copy()
+        for ii in range(n_coarse_chan):
+            dc = ii * n_chan_per_coarse + mid_chan
+            window = data[..., dc+5:dc+10]
+            if not window.size:
+                window = data[..., dc-9:dc-4]
+            expected[..., dc] = np.median(window)
+
+        a = bl.Waterfall()
+        a.data = data
+        a.blank_dc(n_coarse_chan)
+        assert not np.isnan(a.data).any()
+        assert np.allclose(a.data, expected)
+
+    a = bl.Waterfall()
+    a.data = np.ones((16, 1, 4), dtype='float32')
+    with pytest.raises(ValueError):
+        a.blank_dc(1)
+
+def test_grab_data_cache():
+    a = bl.Waterfall(voyager_h5)
+    f0, d0 = a.grab_data(if_id=0)
+    f1, d1 = a.grab_data(if_id=0)
+    assert f0 is f1 and d0 is d1
+
+    # Re-reading the data must not return stale slices
+    a.read_data()
+    f2, d2 = a.grab_data(if_id=0)
+    assert d2 is not d0
+    assert np.array_equal(d0, d2)
+
+    # Reassigning the data must not keep the old array alive through the cache
+    a.data = a.data * 2
+    f3, d3 = a.grab_data(if_id=0)
+    assert np.array_equal(d3, 2 * d0)
+    old = weakref.ref(a.data)
+    a.data = a.data * 2
+    f4, d4 = a.grab_data(if_id=0)
+    assert np.array_equal(d4, 4 * d0)
+    del f3, d3
+    gc.collect()
+    assert old() is None
+
+def test_context_manager():
+    with bl.Waterfall(voyager_h5) as a:
+        assert a.data is not None
+    assert a.data is None
+    assert not a.container.h5
+
+def test_write_to_hdf5_chunks():
+    import h5py
+
+    a = bl.Waterfall(voyager_h5)
+    a.write_to_hdf5('test_chunks.h5', chunks=(4, 1, 65536))
+    with h5py.File('test_chunks.h5', 'r') as h5:
+        assert h5['data'].chunks == (4, 1, 65536)
+        assert np.array_equal(h5['data'][:], a.data)
+    os.remove('test_chunks.h5')
+
+def test_write_to_hdf5_compression():
+    import h5py
+
+    a = bl.Waterfall(voyager_h5)
+    for compression in ('lzf', 'gzip', 'none'):
+        a.write_to_hdf5('test_compress.h5', compression=compression)
+        with h5py.File('test_compress.h5', 'r') as h5:
+            assert h5['data'].compression == (None if compression == 'none' else compression)
+            assert np.array_equal(h5['data'][:], a.data)
+        os.remove('test_compress.h5')
+
+    with pytest.raises(ValueError):
+        a.write_to_hdf5('test_compress.h5', compression='zip')
+
+def test_streamed_conversions():
+    """ Writing without loading the data first (as cmd_tool does) must give the same files """
+    import h5py
+
+    selection = {'f_start': 8419.24, 'f_stop': 8419.35, 't_start': 2, 't_stop': 10}
+    for filename in (voyager_h5, voyager_fil):
+        for kwargs in ({}, selection):
+            for compression in ('bitshuffle', 'gzip', 'none'):
+                bl.Waterfall(filename, **kwargs).write_to_hdf5('test_loaded.h5', compression=compression)
+                bl.Waterfall(filename, load_data=False, **kwargs).write_to_hdf5('test_streamed.h5',
+                                                                                compression=compression)
+                with h5py.File('test_loaded.h5', 'r') as loaded, h5py.File('test_streamed.h5', 'r') as streamed:
+                    assert np.array_equal(loaded['data'][:], streamed['data'][:])
+                    for key, value in loaded['data'].attrs.items():
+                        assert np.array_equal(value, streamed['data'].attrs[key])
+
+            bl.Waterfall(filename, **kwargs).write_to_fil('test_loaded.fil')
+            bl.Waterfall(filename, load_data=False, **kwargs).write_to_fil('test_streamed.fil')
+            with open('test_loaded.fil', 'rb') as loaded, open('test_streamed.fil', 'rb') as streamed:
+                assert loaded.read() == streamed.read()
+
+        # Scrunching must not move the frequency selection
+        bl.Waterfall(filename, **selection).write_to_hdf5('test_loaded.h5', f_scrunch=2)
+        bl.Waterfall(filename, load_data=False, **selection).write_to_hdf5('test_streamed.h5', f_scrunch=2)
+        with h5py.File('test_loaded.h5', 'r') as loaded, h5py.File('test_streamed.h5', 'r') as streamed:
+            assert np.array_equal(loaded['data'][:], streamed['data'][:])
+            assert loaded['data'].attrs['foff'] == streamed['data'].attrs['foff']
+
+    for filename in ('test_loaded.h5', 'test_streamed.h5', 'test_loaded.fil', 'test_streamed.fil'):
+        os.remove(filename)
+
 def test_cmdline():
     from blimpy.waterfall import cmd_tool
 
@@ -29,25 +145,24 @@ def test_cmdline():
     args = [voyager_h5, '-i']
     cmd_tool(args)
 
-    if os.path.exists('test.h5'):
-        os.remove('test.h5')
-        args = [voyager_h5, '-H', '-o', 'test.h5']
-        cmd_tool(args)
-        assert os.path.exists('test.h5')
-        os.remove('test.h5')
+    args = [voyager_h5, '-q', '-S', '-s', 'test.png']
+    cmd_tool(args)
 
-    if os.path.exists('test.fil'):
-        os.remove('test.fil')
-        args = [voyager_h5, '-F', '-o', 'test.fil']
-        cmd_tool(args)
-        assert os.path.exists('test.fil')
-        os.remove('test.fil')
+    args = [voyager_h5, '-H', '-o', 'test.h5']
+    cmd_tool(args)
+    assert os.path.exists('test.h5')
+    os.remove('test.h5')
+
+    args = [voyager_h5, '-F', '-o', 'test.fil']
+    cmd_tool(args)
+    assert os.path.exists('test.fil')
+    os.remove('test.fil')
 
 def test_cmd_arguments():
     from blimpy.waterfall import cmd_tool
     
     args = [voyager_h5, '-H', '-F', '-o', 'test.fil']
-    with pytest.raises(Warning):
+    with pytest.raises(SystemExit):
         cmd_tool(args)
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import blimpy as bl
+import os
 
-from tests.data import voyager_h5
+from tests.data import voyager_h5, voyager_fil
 
 def test_write_to_fil():
     """ Load Voyager dataset and test plotting """
@@ -8,5 +9,15 @@ def test_write_to_fil():
     a = bl.Waterfall(voyager_h5)
     a.write_to_fil('test_out.fil')
 
+def test_write_to_fil_copy():
+    """ Unloaded .fil files are copied; the result must match a loaded write """
+
+    a = bl.Waterfall(voyager_fil, load_data=False)
+    a.write_to_fil('test_copy.fil')
+    b = bl.Waterfall(voyager_fil)
+    b.write_to_fil('test_out.fil')
+    assert open('test_copy.fil', 'rb').read() == open('test_out.fil', 'rb').read()
+    os.remove('test_copy.fil')
+
 if __name__ == "__main__":
     test_write_to_fil()
\ No newline at end of file